@@ -6,47 +6,142 @@ import numpy as np
 from sklearn.cluster import KMeans
 from sklearn.feature_extraction.text import TfidfVectorizer
 import re
-from sentence_transformers import SentenceTransformer
 import random
+import os
+import sys
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+# Shared helpers (model registry, caches, Solr client) live next to the pipeline scripts
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scripts'))
+import model_registry
+from embedding_cache import QueryEmbeddingCache, TTLCache
+from solr_client import SolrClient, IndexGenerations
+from category_matcher import CategoryMatcher, CATEGORY_SLUGS, OTHER_CATEGORY
+from enrich_reviews import PREVIEW_CHARS, make_preview
+from vector_index import VectorIndex
+from quantization import load_scale, quantize
+from rank_fusion import reciprocal_rank_fusion, RRF_K
+from knn_query import knn_params
+from doc_vectors import SIMILAR_NEIGHBORS
 
 app = Flask(__name__)
 CORS(app)
 
+# Load the embedding model once per worker so the first semantic search is not slow
+model_registry.warm_up()
+
 # Configure Solr endpoints
 SOLR_BASE_URL = "http://localhost:8983/solr"
 CORES = {
     'boosted': 'ign_boosted',
-    'semantic': 'ign_semantic'
+    # Set SEMANTIC_CORE=ign_semantic_byte to search the int8-quantized vectors instead
+    'semantic': os.environ.get('SEMANTIC_CORE', 'ign_semantic')
+}
+
+# Query vectors for a BYTE vector field are quantized with the scale its vectors were indexed with
+SEMANTIC_VECTOR_SCALE = load_scale(os.environ['SEMANTIC_VECTOR_SCALE']) if os.environ.get('SEMANTIC_VECTOR_SCALE') else None
+
+# One pooled client for every route; a stuck Solr fails fast instead of hanging workers
+SOLR_CONNECT_TIMEOUT = 2.0
+SOLR_READ_TIMEOUT = 10.0
+solr = SolrClient(
+    SOLR_BASE_URL,
+    cores=CORES,
+    connect_timeout=SOLR_CONNECT_TIMEOUT,
+    read_timeout=SOLR_READ_TIMEOUT
+)
+
+# Query embedding cache (set EMBEDDING_CACHE_PATH to keep it on disk across restarts)
+EMBEDDING_CACHE_SIZE = 2048
+EMBEDDING_CACHE_TTL = 24 * 3600
+EMBEDDING_DISK_CACHE_SIZE = 50000
+query_embeddings = QueryEmbeddingCache(
+    max_entries=EMBEDDING_CACHE_SIZE,
+    ttl=EMBEDDING_CACHE_TTL,
+    disk_path=os.environ.get('EMBEDDING_CACHE_PATH'),
+    disk_max_entries=EMBEDDING_DISK_CACHE_SIZE
+)
+
+# Final /search payloads, keyed by core, index generation and the canonical Solr params.
+# A commit changes the core's index version, which bumps its generation.
+RESULT_CACHE_SIZE = 512
+RESULT_CACHE_TTL = 600
+INDEX_VERSION_CHECK_INTERVAL = 10.0
+search_results = TTLCache(max_entries=RESULT_CACHE_SIZE, ttl=RESULT_CACHE_TTL)
+index_generations = IndexGenerations(solr, CORES.values(), check_interval=INDEX_VERSION_CHECK_INTERVAL)
+
+# Paragraphs considered by a semantic search before they are collapsed into reviews
+SEMANTIC_TOP_K = int(os.environ.get('SEMANTIC_TOP_K', 150))
+
+# Set SEMANTIC_BACKEND=local to answer semantic searches from an in-process vector
+# index over the files written by `make process-semantic` instead of the Solr core
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data')
+SEMANTIC_BACKEND = os.environ.get('SEMANTIC_BACKEND', 'solr')
+LOCAL_INDEX_FIELDS = ["id", "parent_id", "Title", "Content", "Score", "Subtitle"]
+local_index = None
+if SEMANTIC_BACKEND == 'local':
+    local_index = VectorIndex.load(
+        os.environ.get('SEMANTIC_DOCUMENTS', os.path.join(DATA_DIR, 'ign_semantic.jsonl')),
+        os.environ.get('SEMANTIC_VECTORS', os.path.join(DATA_DIR, 'ign_semantic_vectors.npy'))
+    )
+
+# Hybrid search sends the lexical and the vector query at the same time and fuses
+# the two ranked lists of reviews with weighted reciprocal rank fusion
+HYBRID_WEIGHTS = {'boosted': 1.0, 'semantic': 1.0}
+hybrid_executor = ThreadPoolExecutor(max_workers=16)
+
+# More-like-this lists per review id, invalidated the same way as search results
+SIMILAR_CACHE_SIZE = 1024
+SIMILAR_CACHE_TTL = 3600
+similar_reviews = TTLCache(max_entries=SIMILAR_CACHE_SIZE, ttl=SIMILAR_CACHE_TTL)
+SIMILAR_ROWS = SIMILAR_NEIGHBORS
+SIMILAR_SEARCH_TYPES = {'boosted', 'semantic'}
+SIMILAR_FIELDS = "id,Title,Score,Subtitle,Preview"
+
+# Keyword categories used to group search results
+category_matcher = CategoryMatcher()
+
+# Reviews in the boosted core carry precomputed category fields (scripts/enrich_reviews.py),
+# so category filters use a cheap fq on `categories` and clustering reads `primary_category`
+STORED_CATEGORIES = True
+# Only these values reach the `categories` filter; other categories leave results unfiltered
+CATEGORY_FILTERS = set(CATEGORY_SLUGS.values())
+# Keyword filters for cores without the `categories` field (the semantic core, or an unenriched boosted core)
+CATEGORY_CONTENT_FILTERS = {
+    'controls': 'Content:(controls OR gameplay OR mechanics OR handling)',
+    'multiplayer': 'Content:(multiplayer OR "co-op" OR "online multiplayer" OR "pvp" OR "player vs player" OR "competitive multiplayer" OR "online mode" OR "multiplayer mode" OR "cooperative" OR "online play" OR "team-based" OR "battle royale")',
+    'relaxing': 'Content:(relaxing OR peaceful OR calm OR casual)',
+    'story': 'Content:(story OR narrative OR plot OR characters)',
+    'technical': 'Content:(graphics OR performance OR fps OR resolution)'
 }
 
 @app.route('/')
 def home():
     return render_template('index.html')
 
+@app.route('/stats')
+def get_stats():
+    return jsonify({
+        'models': model_registry.get_stats(),
+        'query_embedding_cache': query_embeddings.stats(),
+        'search_result_cache': search_results.stats(),
+        'similar_reviews_cache': similar_reviews.stats(),
+        'solr': solr.stats()
+    })
+
+@app.route('/cache/invalidate', methods=['POST'])
+def invalidate_cache():
+    # Lets indexing jobs drop cached results right after a commit
+    index_generations.bump()
+    return jsonify({'status': 'ok'})
+
 @app.route('/latest')
 def get_latest_reviews():
     try:
         # Query Solr for latest reviews
-        solr_url = f"{SOLR_BASE_URL}/ign_boosted/select"
-        query = {
-            "params": {
-                "q": "Subheader:*2024*",  # Find reviews from 2024
-                "fl": "id,Title,Content,Score,Subtitle,Subheader",
-                "rows": 20,  # Get more to randomly select from
-                "sort": "random_1234 desc"  # Random sort
-            }
-        }
-        
-        response = requests.post(solr_url, json=query)
-        response.raise_for_status()
-        
-        results = response.json()
-        if results['response']['docs']:
-            # Select 6 random reviews from the results
-            latest_reviews = random.sample(results['response']['docs'], min(6, len(results['response']['docs'])))
-            return jsonify(latest_reviews)
-        else:
-            return jsonify([])
+        results = solr.select('boosted', latest_reviews_query())
+        return jsonify(pick_latest_reviews(results))
             
     except Exception as e:
         app.logger.error(f"Error fetching latest reviews: {str(e)}")
@@ -56,19 +151,7 @@ def get_latest_reviews():
 def get_review(review_id):
     try:
         # Query Solr for the specific review
-        solr_url = f"{SOLR_BASE_URL}/ign_boosted/select"
-        query = {
-            "params": {
-                "q": f"id:{review_id}",
-                "fl": "*",
-                "rows": 1
-            }
-        }
-        
-        response = requests.post(solr_url, json=query)
-        response.raise_for_status()
-        
-        results = response.json()
+        results = solr.select('boosted', review_query(review_id))
         if results['response']['docs']:
             return jsonify(results['response']['docs'][0])
         else:
@@ -81,38 +164,17 @@ def get_review(review_id):
 @app.route('/more-like-this/<review_id>')
 def get_similar_reviews(review_id):
     try:
-        # First get the original review from boosted core
-        solr_url = f"{SOLR_BASE_URL}/ign_boosted/select"
-        
-        # Get the original review
-        query = {
-            "params": {
-                "q": f"id:{review_id}",
-                "fl": "*"
-            }
-        }
-        
-        response = requests.post(solr_url, json=query)
-        review = response.json()['response']['docs'][0]
-        
-        # Now find similar reviews using mlt query
-        similar_query = {
-            "params": {
-                "q": f"{review['Content']}",  # Use the content for similarity
-                "defType": "edismax",
-                "qf": "Content^4 Title^2",
-                "pf": "Content^2",
-                "fq": f"-id:{review_id}",  # Exclude the current review
-                "fl": "id,Title,Score,Subtitle,Content",
-                "rows": "5",
-                "sort": "score desc"
-            }
-        }
-        
-        similar_response = requests.post(solr_url, json=similar_query)
-        similar_response.raise_for_status()
-        
-        return jsonify(similar_response.json()['response']['docs'])
+        search_type = similar_search_type(request.args.get('searchType'))
+        cache_key = similar_cache_key(review_id, search_type)
+        docs = similar_reviews.get(cache_key)
+        if docs is None:
+            if search_type == 'semantic':
+                docs = find_vector_neighbors(review_id)
+            else:
+                # Solr builds the similarity query from the review's stored term vectors
+                docs = solr.select('boosted', similar_reviews_query(review_id))['response']['docs']
+            similar_reviews.put(cache_key, docs)
+        return jsonify(docs)
         
     except Exception as e:
         app.logger.error(f"Error fetching similar reviews: {str(e)}")
@@ -122,54 +184,34 @@ def get_similar_reviews(review_id):
 def search():
     try:
         data = request.get_json()
-        if not data:
-            return jsonify({'error': 'No data provided'}), 400
+        search_params, error = parse_search_request(data)
+        if error:
+            return jsonify({'error': error}), 400
             
-        query = data.get('query', '')
-        search_type = data.get('searchType', 'boosted')
-        category = data.get('category', 'all')
-        min_score = float(data.get('minScore', 0)) if data.get('minScore') else None
-        
-        # Don't require query if category is selected
-        if not query and category == 'all':
-            return jsonify({'error': 'Query is required when no category is selected'}), 400
+        query, search_type, category, min_score = search_params
             
+        if search_type == 'hybrid' and query:
+            return jsonify(hybrid_search(query, category, min_score))
+
+        # The local index has no category fields, so category filters still go to Solr
+        if search_type == 'semantic' and query and category == 'all' and local_index is not None:
+            return jsonify(local_semantic_search(query, min_score))
+
         # Get appropriate core name
         core = CORES.get(search_type, CORES['boosted'])
         
         # Construct Solr query based on search type
         solr_query = construct_solr_query(query, search_type, category, min_score)
         
-        # Send request to Solr
-        solr_url = f"{SOLR_BASE_URL}/{core}/select"
-        headers = {'Content-Type': 'application/json'}
-        
-        response = requests.post(solr_url, json=solr_query, headers=headers)
-        response.raise_for_status()
-        
-        results = response.json()
-        
-        if results['response']['docs']:
-            docs = results['response']['docs']
-            
-            # Cluster results if we have enough documents
-            if len(docs) >= 3:
-                clustered_results, cluster_labels = cluster_results(docs)
-            else:
-                clustered_results = {'0': docs}
-                cluster_labels = {'0': 'All Results'}
-                
-            return jsonify({
-                'clusters': clustered_results,
-                'cluster_labels': cluster_labels,
-                'total': results['response']['numFound']
-            })
-        else:
-            return jsonify({
-                'clusters': {'0': []},
-                'cluster_labels': {'0': 'No Results'},
-                'total': 0
-            })
+        # Identical searches reuse the clustered payload until the index changes
+        cache_key = search_cache_key(core, solr_query)
+        payload = search_results.get(cache_key)
+        if payload is None:
+            # Send request to Solr
+            results = solr.select(core, solr_query)
+            payload = format_search_results(results)
+            search_results.put(cache_key, payload)
+        return jsonify(payload)
             
     except requests.RequestException as e:
         app.logger.error(f"Solr request failed: {str(e)}")
@@ -178,38 +220,292 @@ def search():
         app.logger.error(f"Search error: {str(e)}")
         return jsonify({'error': 'Internal server error'}), 500
 
+def latest_reviews_query():
+    return {
+        "params": {
+            "q": "Subheader:*2024*",  # Find reviews from 2024
+            "fl": "id,Title,Preview,Score,Subtitle,Subheader",
+            "rows": 20,  # Get more to randomly select from
+            "sort": "random_1234 desc"  # Random sort
+        }
+    }
+
+def pick_latest_reviews(results):
+    """Select 6 random reviews from the results"""
+    docs = results['response']['docs']
+    return random.sample(docs, min(6, len(docs)))
+
+# Fields the review modal renders; the document vector, neighbor list and category scores stay in Solr
+REVIEW_FIELDS = "id,Title,Content,Score,Subtitle,Subheader"
+
+def review_query(review_id):
+    return {
+        "params": {
+            "q": f"id:{review_id}",
+            "fl": REVIEW_FIELDS,
+            "rows": 1
+        }
+    }
+
+def similar_reviews_query(review_id):
+    """
+    More-like-this query for a review, answered in one request: the mlt parser
+    picks the review's most interesting terms from its term vectors and
+    excludes the review itself from the results.
+    """
+    return {
+        "params": {
+            "q": "{!mlt qf=Content,Title mintf=2 mindf=2 maxqt=25 v=$review_id}",
+            "review_id": review_id,
+            "fl": SIMILAR_FIELDS,
+            "rows": SIMILAR_ROWS,
+            "sort": "score desc"
+        }
+    }
+
+def similar_search_type(search_type):
+    """The /more-like-this searchType, with unknown values treated as 'boosted'"""
+    return search_type if search_type in SIMILAR_SEARCH_TYPES else 'boosted'
+
+def similar_cache_key(review_id, search_type='boosted'):
+    core = CORES['boosted']
+    return f"{core}|{index_generations.get(core)}|{search_type}|{review_id}"
+
+def precomputed_neighbors_query(review_id):
+    """
+    Fetch a review's document vector together with its precomputed neighbors:
+    the review matches the term query and its similar_ids are joined to the
+    neighbors' ids, so hot reviews are answered by this single request.
+    """
+    return {
+        "params": {
+            "q": "{!bool should=$source should=$neighbors}",
+            "source": "{!term f=id v=$review_id}",
+            "neighbors": "{!join from=similar_ids to=id v=$source}",
+            "review_id": review_id,
+            "fl": f"{SIMILAR_FIELDS},doc_vector,similar_ids",
+            "rows": SIMILAR_ROWS + 1
+        }
+    }
+
+def vector_neighbors_query(review_id, doc_vector):
+    """Nearest reviews by document vector (doc_vectors.py), excluding the review itself"""
+    return {
+        "params": {
+            **knn_params(doc_vector, SIMILAR_ROWS, field="doc_vector"),
+            "fq": "{!bool must_not=$source}",
+            "source": "{!term f=id v=$review_id}",
+            "review_id": review_id,
+            "fl": SIMILAR_FIELDS,
+            "rows": SIMILAR_ROWS
+        }
+    }
+
+def pick_precomputed_neighbors(results, review_id):
+    """
+    Split a precomputed_neighbors_query response into (neighbors, review).
+    neighbors is None when the review has no stored neighbor list.
+    """
+    docs = {doc['id']: doc for doc in results['response']['docs']}
+    review = docs.pop(review_id, None)
+    if review is None or not review.get('similar_ids'):
+        return None, review
+    neighbors = [docs[i] for i in review['similar_ids'] if i in docs]
+    for doc in neighbors:
+        doc.pop('doc_vector', None)
+        doc.pop('similar_ids', None)
+    return neighbors, review
+
+def find_vector_neighbors(review_id):
+    """Similar reviews by embedding: stored neighbor list, else a knn query seeded with the review's vector"""
+    neighbors, review = pick_precomputed_neighbors(
+        solr.select('boosted', precomputed_neighbors_query(review_id)), review_id
+    )
+    if neighbors is not None:
+        return neighbors
+    if review is not None and review.get('doc_vector'):
+        return solr.select('boosted', vector_neighbors_query(review_id, review['doc_vector']))['response']['docs']
+    # Reviews without a document vector yet fall back to term-vector similarity
+    return solr.select('boosted', similar_reviews_query(review_id))['response']['docs']
+
+def parse_search_request(data):
+    """Validate the /search JSON body; returns ((query, search_type, category, min_score), error)"""
+    if not data:
+        return None, 'No data provided'
+        
+    query = data.get('query', '')
+    search_type = data.get('searchType', 'boosted')
+    category = data.get('category', 'all')
+    if not isinstance(category, str):
+        return None, 'Invalid category'
+    min_score = float(data.get('minScore', 0)) if data.get('minScore') else None
+    
+    # Don't require query if category is selected
+    if not query and category == 'all':
+        return None, 'Query is required when no category is selected'
+    
+    return (query, search_type, category, min_score), None
+
+def search_cache_key(core, solr_query):
+    """Cache key for a search: core, its index generation and the canonicalized Solr params"""
+    canonical = json.dumps(solr_query, sort_keys=True, separators=(',', ':'))
+    return f"{core}|{index_generations.get(core)}|{canonical}"
+
+def result_docs(results):
+    """Docs of a Solr response, with previews filled in and paragraph hits mapped to their review"""
+    docs = results['response']['docs']
+    
+    # Cores without a stored preview return a highlighted snippet of Content instead
+    highlighting = results.get('highlighting', {})
+    for doc in docs:
+        snippets = highlighting.get(doc['id'], {}).get('Content')
+        if snippets and 'Preview' not in doc:
+            doc['Preview'] = snippets[0]
+        # Collapsed paragraph hits stand for their review, which is what /review/<id> loads
+        if 'parent_id' in doc:
+            doc['paragraph_id'] = doc['id']
+            doc['id'] = doc.pop('parent_id')
+    return docs
+
+def local_semantic_search(query, min_score):
+    """Semantic search on the in-process vector index; returns the same payload as the Solr path"""
+    query_vector = query_embeddings.get_or_compute(query, model_registry.DEFAULT_MODEL, model_registry.encode)
+    results = local_index.select(
+        query_vector, rows=30, top_k=SEMANTIC_TOP_K, fl=LOCAL_INDEX_FIELDS, min_score=min_score, collapse=True
+    )
+    for doc in results['response']['docs']:
+        doc['Preview'] = make_preview(doc.pop('Content', ''))
+    return format_search_results(results)
+
+def hybrid_queries(query, category, min_score):
+    """The lexical and the vector query of a hybrid search, keyed by CORES key"""
+    return {
+        'boosted': construct_solr_query(query, 'boosted', category, min_score),
+        'semantic': construct_solr_query(query, 'semantic', category, min_score)
+    }
+
+def hybrid_cache_key(queries):
+    return 'hybrid|' + '|'.join(search_cache_key(CORES[key], queries[key]) for key in sorted(queries))
+
+def fuse_results(results_by_core, rows=30):
+    """
+    Fuse the responses of a hybrid search into one Solr-style response.
+
+    Both lists rank review ids (semantic hits are collapsed per review), so a
+    review found by both cores is counted once, keeping the boosted document
+    since it carries the precomputed category fields.
+    """
+    keys = [key for key in ('boosted', 'semantic') if key in results_by_core]
+    docs_by_core = [result_docs(results_by_core[key]) for key in keys]
+
+    ids, _ = reciprocal_rank_fusion(
+        [[doc['id'] for doc in docs] for docs in docs_by_core],
+        k=RRF_K,
+        weights=[HYBRID_WEIGHTS[key] for key in keys]
+    )
+
+    by_id = {}
+    for docs in reversed(docs_by_core):
+        by_id.update((doc['id'], doc) for doc in docs)
+    return {'response': {'docs': [by_id[doc_id] for doc_id in ids[:rows]], 'numFound': len(ids)}}
+
+def hybrid_search(query, category, min_score):
+    """Run a hybrid search with both cores queried concurrently; returns the /search payload"""
+    queries = hybrid_queries(query, category, min_score)
+    cache_key = hybrid_cache_key(queries)
+    payload = search_results.get(cache_key)
+    if payload is None:
+        futures = {key: hybrid_executor.submit(solr.select, key, body) for key, body in queries.items()}
+        payload = format_search_results(fuse_results({key: future.result() for key, future in futures.items()}))
+        search_results.put(cache_key, payload)
+    return payload
+
+def format_search_results(results):
+    """Turn a Solr response into the clustered payload the search page expects"""
+    if results['response']['docs']:
+        docs = result_docs(results)
+        
+        # Cluster results if we have enough documents
+        if len(docs) >= 3:
+            clustered_results, cluster_labels = cluster_results(docs)
+        else:
+            clustered_results = {'0': docs}
+            cluster_labels = {'0': 'All Results'}
+            
+        return {
+            'clusters': clustered_results,
+            'cluster_labels': cluster_labels,
+            'total': results['response']['numFound']
+        }
+    else:
+        return {
+            'clusters': {'0': []},
+            'cluster_labels': {'0': 'No Results'},
+            'total': 0
+        }
+
 def construct_solr_query(query, search_type, category, min_score=None):
     """Construct appropriate Solr query based on search parameters"""
     base_query = {
         "params": {
-            "fl": "id,Title,Content,Score,Subtitle,Subheader",
+            "fl": "id,Title,Score,Subtitle,Subheader,primary_category",
             "rows": 30
         }
     }
     
+    # Every constraint is its own fq entry so Solr's filterCache can reuse it
+    # across searches that combine it with different queries or other filters
+    filters = []
+    
     # Add score filter if specified
     if min_score is not None and min_score > 0:
-        base_query["params"]["fq"] = f"Score:[{min_score} TO *]"
+        filters.append(f"Score:[{min_score} TO *]")
+
+    # The semantic core holds paragraph chunks without the precomputed category fields
+    use_stored_categories = STORED_CATEGORIES and search_type != 'semantic'
+
+    # Return one hit per review (its best paragraph) instead of several paragraphs of the same review
+    if search_type == 'semantic':
+        filters.append("{!collapse field=parent_id}")
+        base_query["params"]["fl"] += ",parent_id"
+
+    # Results only show a preview; the full review is loaded through /review/<id>
+    if use_stored_categories:
+        base_query["params"]["fl"] += ",Preview"
+    else:
+        base_query["params"].update({
+            "hl": "true",
+            "hl.method": "unified",
+            "hl.fl": "Content",
+            "hl.snippets": 1,
+            "hl.fragsize": PREVIEW_CHARS,
+            "hl.defaultSummary": "true",  # Fall back to the start of Content when no term matches
+            "hl.encoder": "html"
+        })
 
     # If no query but category selected, search by category
     if not query and category != 'all':
-        category_terms = {
-            'controls': 'Content:(controls OR gameplay OR mechanics OR handling)',
-            'multiplayer': 'Content:(multiplayer OR "co-op" OR "online multiplayer" OR "pvp" OR "player vs player" OR "competitive multiplayer" OR "online mode" OR "multiplayer mode" OR "cooperative" OR "online play" OR "team-based" OR "battle royale")',
-            'relaxing': 'Content:(relaxing OR peaceful OR calm OR casual)',
-            'story': 'Content:(story OR narrative OR plot OR characters)',
-            'technical': 'Content:(graphics OR performance OR fps OR resolution)'
-        }
-        base_query["params"]["q"] = category_terms.get(category, '*:*')
+        if use_stored_categories:
+            if category in CATEGORY_FILTERS:
+                filters.append(f"categories:{category}")
+        else:
+            if category in CATEGORY_CONTENT_FILTERS:
+                filters.append(CATEGORY_CONTENT_FILTERS[category])
+        # Results are sorted by score, so matching only needs to filter
+        base_query["params"]["q"] = "*:*"
         base_query["params"]["sort"] = "Score desc"  # Sort by score when searching by category only
     
     elif search_type == 'semantic':
-        model = SentenceTransformer('all-MiniLM-L6-v2')
-        query_vector = model.encode(query, convert_to_tensor=False).tolist()
-        base_query["params"].update({
-            "q": "{!knn f=vector topK=50}" + str(query_vector),
-            "rows": 30
-        })
+        query_vector = query_embeddings.get_or_compute(
+            query, model_registry.DEFAULT_MODEL, model_registry.encode
+        )
+        if SEMANTIC_VECTOR_SCALE is not None:
+            query_vector = quantize(query_vector, SEMANTIC_VECTOR_SCALE)
+        # Paragraphs are collapsed after the knn search, so look at enough of them to fill a page of reviews
+        base_query["params"].update(knn_params(query_vector, SEMANTIC_TOP_K))
+        # The category applies to the semantic search too (and so to its leg of a hybrid search)
+        if category in CATEGORY_CONTENT_FILTERS:
+            filters.append(CATEGORY_CONTENT_FILTERS[category])
     else:  # boosted with query
         # Clean and prepare the query
         clean_query = query.strip()
@@ -234,7 +530,10 @@ def construct_solr_query(query, search_type, category, min_score=None):
             })
 
         # If category is selected with a query, add it as a filter
-        if category != 'all':
+        if category != 'all' and use_stored_categories:
+            if category in CATEGORY_FILTERS:
+                filters.append(f"categories:{category}")
+        elif category != 'all':
             category_terms = {
                 'controls': '(controls OR gameplay OR mechanics OR handling)',
                 'multiplayer': '(multiplayer OR cooperative OR online OR pvp)',
@@ -243,11 +542,10 @@ def construct_solr_query(query, search_type, category, min_score=None):
                 'technical': '(graphics OR performance OR fps OR resolution)'
             }
             if category in category_terms:
-                filter_query = f"Content:({category_terms[category]})"
-                if 'fq' in base_query["params"]:
-                    base_query["params"]["fq"] += f" AND {filter_query}"
-                else:
-                    base_query["params"]["fq"] = filter_query
+                filters.append(f"Content:({category_terms[category]})")
+    
+    if filters:
+        base_query["params"]["fq"] = filters
     
     return base_query
 
@@ -255,63 +553,23 @@ def cluster_results(docs, num_clusters=5):
     if not docs:
         return {}, {}
         
-    # Predefined categories and their associated keywords
-    categories = {
-        'Tight Controls': [
-            'combat', 'controls', 'gameplay', 'mechanics', 'handling', 'movement',
-            'responsive', 'fluid', 'precise', 'tight', 'combat system'
-        ],
-        'Story & Narrative': [
-            'story', 'narrative', 'plot', 'character', 'dialogue', 'writing',
-            'cutscene', 'storytelling', 'campaign', 'lore', 'world-building'
-        ],
-        'Multiplayer & Social': [
-            'multiplayer', 'co-op', 'cooperative', 'pvp', 'online',
-            'competitive', 'team', 'social', 'battle royale', 'community'
-        ],
-        'Technical & Graphics': [
-            'graphics', 'performance', 'fps', 'resolution', 'visual',
-            'frame rate', 'optimization', 'texture', 'rendering', 'technical'
-        ],
-        'Relaxing': [
-            'atmosphere', 'immersive', 'beautiful', 'peaceful', 'relaxing',
-            'ambient', 'environment', 'mood', 'aesthetic', 'experience'
-        ]
-    }
-
-    def calculate_category_score(text, keywords):
-        """Calculate how well a text matches a category's keywords"""
-        text = text.lower()
-        score = 0
-        for keyword in keywords:
-            # Count occurrences and weight them
-            count = text.count(keyword.lower())
-            if count > 0:
-                # Add extra weight for keyword appearances in title
-                score += count * (3 if keyword in text[:100] else 1)
-        return score
-
     # Initialize results dictionary
     clustered_results = defaultdict(list)
     
-    # Process each document
-    for doc in docs:
-        content = f"{doc.get('Title', '')} {doc.get('Content', '')}"
-        
-        # Calculate scores for each category
-        category_scores = {}
-        for category, keywords in categories.items():
-            score = calculate_category_score(content, keywords)
-            category_scores[category] = score
-        
-        # Assign document to highest scoring category
-        # Only if the score is above a threshold
-        max_category = max(category_scores.items(), key=lambda x: x[1])
-        if max_category[1] > 2:  # Minimum threshold to be included in a category
-            clustered_results[max_category[0]].append(doc)
-        else:
-            # Create a "Mixed" category for documents that don't strongly match any category
-            clustered_results['Other Games'].append(doc)
+    # Reviews enriched at index time already know their category
+    doc_categories = [doc.get('primary_category') for doc in docs]
+    
+    # Score the rest against all categories in one batch and assign each to its
+    # highest scoring category, if the score is above the threshold
+    missing = [i for i, category in enumerate(doc_categories) if not category]
+    if missing:
+        texts = [f"{docs[i].get('Title', '')} {docs[i].get('Content') or docs[i].get('Preview', '')}" for i in missing]
+        for i, category in zip(missing, category_matcher.assign(texts)):
+            # Use a "Mixed" category for documents that don't strongly match any category
+            doc_categories[i] = category or OTHER_CATEGORY
+    
+    for doc, category in zip(docs, doc_categories):
+        clustered_results[category].append(doc)
     
     # Remove empty categories and sort by number of documents
     clustered_results = {k: v for k, v in clustered_results.items() if v}
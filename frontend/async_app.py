@@ -0,0 +1,211 @@
+"""
+Async (ASGI) variant of the search API.
+
+Serves the same routes as app.py, but Solr round-trips go through a
+non-blocking httpx client, so one process can keep many requests waiting on
+Solr at once. CPU-bound work (query embedding, clustering) runs in a thread
+pool so it does not block the event loop.
+
+Run with an ASGI server, e.g.:
+    hypercorn async_app:app --bind 0.0.0.0:5000
+"""
+import asyncio
+import time
+import httpx
+from quart import Quart, render_template, request, jsonify
+from quart_cors import cors
+
+# Query building, clustering and the shared caches are the same as the sync app
+import app as sync_app
+from app import (
+    CORES, SOLR_BASE_URL, SOLR_CONNECT_TIMEOUT, SOLR_READ_TIMEOUT,
+    construct_solr_query, format_search_results, parse_search_request, search_cache_key,
+    latest_reviews_query, pick_latest_reviews, review_query, similar_reviews_query, similar_cache_key,
+    similar_search_type, precomputed_neighbors_query, vector_neighbors_query, pick_precomputed_neighbors,
+    hybrid_queries, hybrid_cache_key, fuse_results
+)
+import model_registry
+from solr_client import LatencyStats
+
+app = cors(Quart(__name__))
+
+
+class AsyncSolrClient:
+    """Non-blocking counterpart of solr_client.SolrClient"""
+
+    def __init__(self, base_url=SOLR_BASE_URL, cores=None, pool_size=100,
+                 connect_timeout=2.0, read_timeout=10.0, retries=2, backoff=0.1):
+        self.base_url = base_url.rstrip('/')
+        self.cores = dict(cores or {})
+        self.retries = retries
+        self.backoff = backoff
+        self.client = httpx.AsyncClient(
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+            limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size)
+        )
+        self.latency = LatencyStats()
+
+    async def select(self, core, body):
+        """Run a /select request, retrying connection errors, timeouts and 5xx responses"""
+        core_name = self.cores.get(core, core)
+        url = f"{self.base_url}/{core_name}/select"
+
+        for attempt in range(self.retries + 1):
+            start = time.perf_counter()
+            try:
+                response = await self.client.post(url, json=body)
+                response.raise_for_status()
+                result = response.json()
+            except (httpx.TransportError, httpx.HTTPStatusError) as e:
+                self.latency.record(core_name, time.perf_counter() - start, error=True)
+                retryable = not isinstance(e, httpx.HTTPStatusError) or e.response.status_code >= 500
+                if not retryable or attempt >= self.retries:
+                    raise
+                await asyncio.sleep(self.backoff * 2 ** attempt)
+                continue
+            self.latency.record(core_name, time.perf_counter() - start)
+            return result
+
+    def stats(self):
+        return self.latency.report()
+
+    async def close(self):
+        await self.client.aclose()
+
+
+async def find_vector_neighbors(review_id):
+    """Async counterpart of app.find_vector_neighbors"""
+    neighbors, review = pick_precomputed_neighbors(
+        await app.solr.select('boosted', precomputed_neighbors_query(review_id)), review_id
+    )
+    if neighbors is not None:
+        return neighbors
+    if review is not None and review.get('doc_vector'):
+        return (await app.solr.select('boosted', vector_neighbors_query(review_id, review['doc_vector'])))['response']['docs']
+    return (await app.solr.select('boosted', similar_reviews_query(review_id)))['response']['docs']
+
+
+async def hybrid_search(query, category, min_score):
+    """Async counterpart of app.hybrid_search: both cores are queried with asyncio.gather"""
+    queries = await run_blocking(hybrid_queries, query, category, min_score)
+    cache_key = hybrid_cache_key(queries)
+    payload = sync_app.search_results.get(cache_key)
+    if payload is None:
+        responses = await asyncio.gather(*(app.solr.select(key, body) for key, body in queries.items()))
+        fused = fuse_results(dict(zip(queries, responses)))
+        payload = await run_blocking(format_search_results, fused)
+        sync_app.search_results.put(cache_key, payload)
+    return payload
+
+
+async def run_blocking(func, *args):
+    """Run CPU-bound work (embedding, clustering) in the default thread pool"""
+    return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+
+
+@app.before_serving
+async def startup():
+    app.solr = AsyncSolrClient(
+        SOLR_BASE_URL,
+        cores=CORES,
+        connect_timeout=SOLR_CONNECT_TIMEOUT,
+        read_timeout=SOLR_READ_TIMEOUT
+    )
+
+@app.after_serving
+async def shutdown():
+    await app.solr.close()
+
+@app.route('/')
+async def home():
+    return await render_template('index.html')
+
+@app.route('/stats')
+async def get_stats():
+    return jsonify({
+        'models': model_registry.get_stats(),
+        'query_embedding_cache': sync_app.query_embeddings.stats(),
+        'search_result_cache': sync_app.search_results.stats(),
+        'similar_reviews_cache': sync_app.similar_reviews.stats(),
+        'solr': app.solr.stats()
+    })
+
+@app.route('/cache/invalidate', methods=['POST'])
+async def invalidate_cache():
+    sync_app.index_generations.bump()
+    return jsonify({'status': 'ok'})
+
+@app.route('/latest')
+async def get_latest_reviews():
+    try:
+        results = await app.solr.select('boosted', latest_reviews_query())
+        return jsonify(pick_latest_reviews(results))
+    except Exception as e:
+        app.logger.error(f"Error fetching latest reviews: {str(e)}")
+        return jsonify([]), 500
+
+@app.route('/review/<review_id>')
+async def get_review(review_id):
+    try:
+        results = await app.solr.select('boosted', review_query(review_id))
+        if results['response']['docs']:
+            return jsonify(results['response']['docs'][0])
+        else:
+            return jsonify({'error': 'Review not found'}), 404
+    except Exception as e:
+        app.logger.error(f"Error fetching review: {str(e)}")
+        return jsonify({'error': 'Failed to fetch review'}), 500
+
+@app.route('/more-like-this/<review_id>')
+async def get_similar_reviews(review_id):
+    try:
+        search_type = similar_search_type(request.args.get('searchType'))
+        cache_key = similar_cache_key(review_id, search_type)
+        docs = sync_app.similar_reviews.get(cache_key)
+        if docs is None:
+            if search_type == 'semantic':
+                docs = await find_vector_neighbors(review_id)
+            else:
+                docs = (await app.solr.select('boosted', similar_reviews_query(review_id)))['response']['docs']
+            sync_app.similar_reviews.put(cache_key, docs)
+        return jsonify(docs)
+    except Exception as e:
+        app.logger.error(f"Error fetching similar reviews: {str(e)}")
+        return jsonify([]), 500
+
+@app.route('/search', methods=['POST'])
+async def search():
+    try:
+        data = await request.get_json()
+        search_params, error = parse_search_request(data)
+        if error:
+            return jsonify({'error': error}), 400
+
+        query, search_type, category, min_score = search_params
+        if search_type == 'hybrid' and query:
+            return jsonify(await hybrid_search(query, category, min_score))
+        if search_type == 'semantic' and query and category == 'all' and sync_app.local_index is not None:
+            return jsonify(await run_blocking(sync_app.local_semantic_search, query, min_score))
+
+        core = CORES.get(search_type, CORES['boosted'])
+
+        # Building a semantic query encodes the text, so keep it off the event loop
+        solr_query = await run_blocking(construct_solr_query, query, search_type, category, min_score)
+
+        cache_key = search_cache_key(core, solr_query)
+        payload = sync_app.search_results.get(cache_key)
+        if payload is None:
+            results = await app.solr.select(core, solr_query)
+            payload = await run_blocking(format_search_results, results)
+            sync_app.search_results.put(cache_key, payload)
+        return jsonify(payload)
+
+    except httpx.HTTPError as e:
+        app.logger.error(f"Solr request failed: {str(e)}")
+        return jsonify({'error': 'Failed to connect to search server'}), 503
+    except Exception as e:
+        app.logger.error(f"Search error: {str(e)}")
+        return jsonify({'error': 'Internal server error'}), 500
+
+if __name__ == '__main__':
+    app.run(debug=True, port=5000)
@@ -99,7 +99,9 @@ document.addEventListener('DOMContentLoaded', function() {
             reviewModal.classList.remove('hidden');
             clusterModal.classList.add('hidden');
             try {
-                const similarResponse = await fetch(`/more-like-this/${review.id}`);
+                // Semantic searches look for neighbors by embedding instead of shared terms
+                const searchType = document.getElementById('searchType').value;
+                const similarResponse = await fetch(`/more-like-this/${review.id}?searchType=${searchType}`);
                 if (!similarResponse.ok) throw new Error('Failed to fetch similar reviews');
                 
                 const similarReviews = await similarResponse.json();
@@ -115,7 +117,7 @@ document.addEventListener('DOMContentLoaded', function() {
                                     ${similar.Score.toFixed(1)}
                                 </span>
                             </div>
-                            <p class="text-gray-600 text-sm line-clamp-2">${similar.Content.substring(0, 100)}...</p>
+                            <p class="text-gray-600 text-sm line-clamp-2">${previewOf(similar, 100)}...</p>
                         </div>
                     `).join('');
                 } else {
@@ -164,7 +166,7 @@ document.addEventListener('DOMContentLoaded', function() {
                             ${review.Score.toFixed(1)}
                         </span>
                     </div>
-                    <p class="text-gray-600 text-sm line-clamp-2">${review.Content.substring(0, 100)}...</p>
+                    <p class="text-gray-600 text-sm line-clamp-2">${previewOf(review, 100)}...</p>
                 </div>
             `).join('');
         } else {
@@ -208,7 +210,7 @@ document.addEventListener('DOMContentLoaded', function() {
                         <div class="text-sm text-gray-500 mb-2">${publishDate}</div>
                         <h4 class="text-xl font-bold text-gray-900 mb-3">${review.Title}</h4>
                         <p class="text-gray-600 line-clamp-3">
-                            ${review.Content.substring(0, 150)}...
+                            ${previewOf(review, 150)}...
                         </p>
                         <div class="mt-4 text-sm text-indigo-600 hover:text-indigo-800">
                             Read full review →
@@ -302,7 +304,7 @@ document.addEventListener('DOMContentLoaded', function() {
                     </div>
                 </div>
                 ${doc.Subtitle ? `<div class="text-gray-600 mb-4">${doc.Subtitle}</div>` : ''}
-                <div class="text-gray-700 line-clamp-3 mb-4">${doc.Content.substring(0, 200)}...</div>
+                <div class="text-gray-700 line-clamp-3 mb-4">${previewOf(doc, 200)}...</div>
                 <div class="flex justify-between items-center">
                     <div class="text-sm text-indigo-600 hover:text-indigo-800">Click to read full review</div>
                     <div class="bg-white text-gray-500 border-2 border-gray-300 rounded-full px-3 py-1 text-sm">
@@ -316,6 +318,11 @@ document.addEventListener('DOMContentLoaded', function() {
         });
     }
 
+    // Search and listing responses carry a short Preview instead of the full Content
+    function previewOf(doc, length) {
+        return doc.Preview || (doc.Content || '').substring(0, length);
+    }
+
     function detectPlatformsFromContent(content) {
         const platformPatterns = {
             'PS5': /\b(PS5|PlayStation 5)\b/i,
@@ -0,0 +1,86 @@
+import numpy as np
+
+# Predefined categories and their associated keywords
+CATEGORIES = {
+    'Tight Controls': [
+        'combat', 'controls', 'gameplay', 'mechanics', 'handling', 'movement',
+        'responsive', 'fluid', 'precise', 'tight', 'combat system'
+    ],
+    'Story & Narrative': [
+        'story', 'narrative', 'plot', 'character', 'dialogue', 'writing',
+        'cutscene', 'storytelling', 'campaign', 'lore', 'world-building'
+    ],
+    'Multiplayer & Social': [
+        'multiplayer', 'co-op', 'cooperative', 'pvp', 'online',
+        'competitive', 'team', 'social', 'battle royale', 'community'
+    ],
+    'Technical & Graphics': [
+        'graphics', 'performance', 'fps', 'resolution', 'visual',
+        'frame rate', 'optimization', 'texture', 'rendering', 'technical'
+    ],
+    'Relaxing': [
+        'atmosphere', 'immersive', 'beautiful', 'peaceful', 'relaxing',
+        'ambient', 'environment', 'mood', 'aesthetic', 'experience'
+    ]
+}
+
+# Short names used in category filters and Solr field names
+CATEGORY_SLUGS = {
+    'Tight Controls': 'controls',
+    'Story & Narrative': 'story',
+    'Multiplayer & Social': 'multiplayer',
+    'Technical & Graphics': 'technical',
+    'Relaxing': 'relaxing'
+}
+
+# Documents whose best category scores no more than this are left uncategorized
+CATEGORY_THRESHOLD = 2
+OTHER_CATEGORY = 'Other Games'
+
+# Keywords found in the first HEAD_CHARS characters (roughly the title) count HEAD_WEIGHT times
+HEAD_CHARS = 100
+HEAD_WEIGHT = 3
+
+
+class CategoryMatcher:
+    """
+    Scores a batch of texts against keyword categories with array operations.
+
+    Each text is lowercased once and every keyword is counted with str.count,
+    which scans in C; the resulting (texts x keywords) count matrix is turned
+    into category scores with a single matrix product instead of per-category
+    Python loops.
+    """
+
+    def __init__(self, categories=CATEGORIES):
+        self.category_names = list(categories)
+        self.keywords = list(dict.fromkeys(k.lower() for words in categories.values() for k in words))
+        keyword_index = {k: i for i, k in enumerate(self.keywords)}
+
+        # membership[k, c]: 1 if keyword k belongs to category c
+        self.membership = np.zeros((len(self.keywords), len(self.category_names)), dtype=np.int64)
+        for c, name in enumerate(self.category_names):
+            for keyword in categories[name]:
+                self.membership[keyword_index[keyword.lower()], c] = 1
+
+    def score(self, texts):
+        """Return a (len(texts), n_categories) matrix of category scores"""
+        texts = [text.lower() for text in texts]
+        keywords = self.keywords
+        counts = np.array([[text.count(k) for k in keywords] for text in texts], dtype=np.int64)
+        in_head = np.array([[k in head for k in keywords] for head in (text[:HEAD_CHARS] for text in texts)])
+
+        weighted = counts * np.where(in_head, HEAD_WEIGHT, 1)
+        return weighted @ self.membership
+
+    def assign(self, texts, threshold=CATEGORY_THRESHOLD):
+        """
+        Return the best category for each text, or None if no category scores
+        above threshold. Ties go to the category listed first.
+        """
+        if not texts:
+            return []
+        scores = self.score(texts)
+        best = scores.argmax(axis=1)
+        best_scores = scores[np.arange(len(texts)), best]
+        return [self.category_names[b] if s > threshold else None for b, s in zip(best, best_scores)]
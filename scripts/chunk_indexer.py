@@ -1,38 +1,169 @@
+import argparse
 import json
 import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from itertools import islice
 import requests
 from tqdm import tqdm
+from json_stream import iter_documents
+from solr_client import SOLR_BASE_URL, make_session
+from vector_sidecar import load_vectors
+from quantization import load_scale, quantize
 
-def index_in_chunks(input_file, solr_url, chunk_size=1000):
-    """Index documents to Solr in chunks"""
-    # Read the full JSON file
-    print(f"Loading JSON from {input_file}...")
-    with open(input_file, 'r') as f:
-        data = json.load(f)
-    
-    total_docs = len(data)
-    print(f"Total documents to index: {total_docs}")
-    
-    # Process in chunks
-    for i in tqdm(range(0, total_docs, chunk_size)):
-        chunk = data[i:i + chunk_size]
-        
+def attach_sidecar_vectors(docs, vectors, scale=None):
+    """
+    Replace each document's vector_row with its vector read from the
+    memory-mapped sidecar, quantized to int8 if a calibration scale is given
+    """
+    for doc in docs:
+        row = doc.pop('vector_row', None)
+        if row is not None:
+            vector = vectors[row] if scale is None else quantize(vectors[row], scale)
+            doc['vector'] = vector.tolist()
+    return docs
+
+def post_chunk(session, update_url, chunk, params, retries=3, backoff=1.0, timeout=(5, 120)):
+    """Send one chunk to Solr, retrying connection errors and 5xx responses with exponential backoff"""
+    for attempt in range(retries + 1):
         try:
-            # Send chunk to Solr
-            response = requests.post(
-                f"{solr_url}/update?commit=true",
-                json=chunk,
-                headers={'Content-Type': 'application/json'}
-            )
-            response.raise_for_status()
+            response = session.post(update_url, params=params, json=chunk, timeout=timeout)
+            if response.status_code < 500:
+                # 4xx means the documents themselves are bad; retrying will not help
+                response.raise_for_status()
+                return
+            error = requests.HTTPError(f"{response.status_code} {response.reason}: {response.text[:200]}")
+        except (requests.ConnectionError, requests.Timeout) as e:
+            error = e
+        if attempt < retries:
+            time.sleep(backoff * 2 ** attempt)
+    raise error
+
+def iter_chunks(documents, chunk_size):
+    """Group a stream of documents into lists of at most chunk_size"""
+    documents = iter(documents)
+    while True:
+        chunk = list(islice(documents, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+class DeadLetterFile:
+    """Append documents from chunks that could not be indexed, one JSON document per line"""
+
+    def __init__(self, path):
+        self.path = path
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def write(self, chunk):
+        if self.path is None:
+            return
+        with self._lock:
+            with open(self.path, 'a') as f:
+                for doc in chunk:
+                    f.write(json.dumps(doc, ensure_ascii=False))
+                    f.write('\n')
+            self.count += len(chunk)
+
+def index_in_chunks(input_file, solr_url, chunk_size=1000, vectors_file=None, workers=4,
+                    commit_within=None, retries=3, backoff=1.0, dead_letter=None, scale=None):
+    """
+    Index documents to Solr in chunks, with several chunks in flight at once.
+
+    The input (a JSON array or JSONL, '-' for STDIN) is parsed incrementally
+    and chunks are built on the fly, so peak memory depends on chunk_size and
+    workers rather than on the size of the corpus.
+
+    Chunks that still fail after all retries are written to the dead-letter
+    file instead of being dropped. Documents are committed once at the end,
+    or by Solr itself when commit_within (milliseconds) is given.
+
+    With a quantization scale, sidecar vectors are sent as int8 values for
+    a core whose vector field uses vectorEncoding=BYTE.
+    """
+    print(f"Streaming documents from {input_file}...")
+    f = sys.stdin if input_file == '-' else open(input_file, 'r')
+
+    # Vectors stay on disk and are only paged in for the chunk being sent
+    vectors = load_vectors(vectors_file) if vectors_file else None
+
+    update_url = f"{solr_url}/update"
+    params = {'commitWithin': commit_within} if commit_within else {}
+    session = make_session(pool_size=workers)
+    failed = DeadLetterFile(dead_letter)
+    indexed = 0
+
+    def send(chunk):
+        if vectors is not None:
+            chunk = attach_sidecar_vectors(chunk, vectors, scale)
+        try:
+            post_chunk(session, update_url, chunk, params, retries=retries, backoff=backoff)
+            return len(chunk), None
         except Exception as e:
-            print(f"Error indexing chunk {i//chunk_size}: {str(e)}")
-            continue
-            
+            failed.write(chunk)
+            return 0, e
+
+    total_docs = 0
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor, tqdm(unit='docs') as progress:
+        in_flight = {}
+
+        def collect(done):
+            nonlocal indexed
+            for future in done:
+                chunk_num, chunk_len = in_flight.pop(future)
+                sent, error = future.result()
+                indexed += sent
+                progress.update(chunk_len)
+                if error is not None:
+                    print(f"Error indexing chunk {chunk_num}: {str(error)}", file=sys.stderr)
+
+        for chunk_num, chunk in enumerate(iter_chunks(iter_documents(f), chunk_size)):
+            total_docs += len(chunk)
+            # Keep a bounded number of chunks queued so memory does not grow with the corpus
+            if len(in_flight) >= workers * 2:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                collect(done)
+            in_flight[executor.submit(send, chunk)] = (chunk_num, len(chunk))
+
+        collect(wait(in_flight).done)
+
+    if f is not sys.stdin:
+        f.close()
+
+    if not commit_within:
+        print("Committing...")
+        session.post(update_url, json={'commit': {}}, timeout=(5, 600)).raise_for_status()
+
+    elapsed = time.perf_counter() - start
+    rate = indexed / elapsed if elapsed > 0 else 0.0
+    print(f"Indexed {indexed}/{total_docs} documents in {elapsed:.1f}s ({rate:.1f} docs/sec)")
+    if failed.count:
+        print(f"{failed.count} documents failed and were written to {dead_letter}")
+    elif dead_letter is None and indexed < total_docs:
+        print(f"{total_docs - indexed} documents failed (use --dead-letter to keep them)")
     print("Indexing complete!")
 
 if __name__ == "__main__":
-    solr_url = "http://localhost:8983/solr/ign_semantic"
-    input_file = "data/ign_semantic.json"
-    
-    index_in_chunks(input_file, solr_url)
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Index a JSON/JSONL file into a Solr core in concurrent chunks.")
+    parser.add_argument('--input', default="data/ign_semantic.jsonl", help="Documents to index (JSON array or JSONL, '-' for STDIN)")
+    parser.add_argument('--uri', default=SOLR_BASE_URL, help=f'URI of the Solr instance (default: {SOLR_BASE_URL})')
+    parser.add_argument('--core', default="ign_semantic", help="Solr core to index into (default: 'ign_semantic')")
+    parser.add_argument('--vectors', default=None,
+                        help='Float32 .npy sidecar written by get_embeddings.py --vectors-out')
+    parser.add_argument('--chunk-size', type=int, default=1000, help='Documents per update request (default: 1000)')
+    parser.add_argument('--workers', type=int, default=4, help='Update requests in flight at once (default: 4)')
+    parser.add_argument('--commit-within', type=int, default=None,
+                        help='Let Solr commit within this many ms instead of one explicit commit at the end')
+    parser.add_argument('--retries', type=int, default=3, help='Retries per failed chunk (default: 3)')
+    parser.add_argument('--dead-letter', default=None, help='JSONL file for documents from chunks that kept failing')
+    parser.add_argument('--quantize-scale', default=None,
+                        help='Calibration JSON from quantization.py; sidecar vectors are sent as int8 for a BYTE vector field')
+    args = parser.parse_args()
+
+    index_in_chunks(args.input, f"{args.uri}/{args.core}", chunk_size=args.chunk_size,
+                    vectors_file=args.vectors, workers=args.workers, commit_within=args.commit_within,
+                    retries=args.retries, dead_letter=args.dead_letter,
+                    scale=load_scale(args.quantize_scale) if args.quantize_scale else None)
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+
+import argparse
+import sys
+import time
+import numpy as np
+import model_registry
+from eval_common import load_query_texts, solr_knn_ids, recall_at_k, core_index_size, latency_summary
+from quantization import load_scale, quantize
+from solr_client import SOLR_BASE_URL, make_session
+
+
+def compare_cores(session, base_url, float_core, byte_core, scale, texts, k=10, top_k=50):
+    """
+    Run every query on the float and on the int8 core.
+
+    Returns recall@k of the byte core's results against the float core's
+    for each query, and the query latencies of both cores in seconds.
+    """
+    recalls = []
+    seconds = {float_core: [], byte_core: []}
+    for text in texts:
+        query_vector = model_registry.encode(text)
+
+        start = time.perf_counter()
+        float_ids = solr_knn_ids(session, f"{base_url}/{float_core}", query_vector, k, top_k)
+        seconds[float_core].append(time.perf_counter() - start)
+
+        # Queries on a BYTE field are quantized with the same scale as the indexed vectors
+        start = time.perf_counter()
+        byte_ids = solr_knn_ids(session, f"{base_url}/{byte_core}", quantize(query_vector, scale), k, top_k)
+        seconds[byte_core].append(time.perf_counter() - start)
+
+        recalls.append(recall_at_k(byte_ids, float_ids))
+    return np.array(recalls), seconds
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Compare the int8-quantized semantic core with the float32 one: index size, latency and recall@k."
+    )
+    parser.add_argument('--uri', default=SOLR_BASE_URL, help=f'URI of the Solr instance (default: {SOLR_BASE_URL})')
+    parser.add_argument('--float-core', default="ign_semantic", help="Core with float32 vectors (default: 'ign_semantic')")
+    parser.add_argument('--byte-core', default="ign_semantic_byte",
+                        help="Core with vectorEncoding=BYTE vectors (default: 'ign_semantic_byte')")
+    parser.add_argument('--scale', default="data/ign_semantic_vectors.scale.json",
+                        help='Calibration JSON the byte core was indexed with')
+    parser.add_argument('--queries', default=None,
+                        help='File with one query text per line (default: terms of queries/*/query_sys1.json)')
+    parser.add_argument('-k', type=int, default=10, help='Results compared per query (default: 10)')
+    parser.add_argument('--top-k', type=int, default=50, help='topK of the knn queries (default: 50)')
+    parser.add_argument('--warmup', type=int, default=1, help='Untimed passes over the queries first (default: 1)')
+    args = parser.parse_args()
+
+    texts = load_query_texts(args.queries)
+    if not texts:
+        print("No queries found", file=sys.stderr)
+        sys.exit(1)
+
+    session = make_session()
+    scale = load_scale(args.scale)
+    for _ in range(args.warmup):
+        compare_cores(session, args.uri, args.float_core, args.byte_core, scale, texts, k=args.k, top_k=args.top_k)
+    recalls, seconds = compare_cores(session, args.uri, args.float_core, args.byte_core, scale, texts,
+                                     k=args.k, top_k=args.top_k)
+
+    print(f"{'core':<20} {'index size':>12} {'p50 ms':>8} {'p95 ms':>8}")
+    sizes = {}
+    for core in (args.float_core, args.byte_core):
+        sizes[core] = core_index_size(session, args.uri, core)
+        p50, p95 = latency_summary(seconds[core])
+        print(f"{core:<20} {sizes[core] / 2 ** 20:>9.1f} MB {p50:>8.1f} {p95:>8.1f}")
+
+    print(f"\nByte index is {sizes[args.byte_core] / max(sizes[args.float_core], 1):.0%} of the float index")
+    print(f"recall@{args.k} of {args.byte_core} against {args.float_core}: "
+          f"mean {recalls.mean():.4f}, min {recalls.min():.4f} over {len(texts)} queries")
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+
+import argparse
+import sys
+import numpy as np
+from json_stream import iter_documents, write_jsonl
+from vector_sidecar import load_vectors
+
+# Neighbors stored per review; the frontend fetches exactly this many, so more would be cut off
+SIMILAR_NEIGHBORS = 5
+
+
+def normalize_rows(matrix):
+    """Scale every row to unit length (all-zero rows are left as they are)"""
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms > 0, norms, 1.0)
+
+
+def mean_document_vectors(chunks, vectors=None, block_size=4096):
+    """
+    Average the paragraph vectors of each review into one document vector.
+
+    chunks are the paragraph documents written by get_embeddings.py, carrying
+    either a vector_row into the `vectors` sidecar or an inline vector. Every
+    paragraph vector is normalized before averaging so long paragraphs do not
+    dominate, and the mean is normalized again for cosine similarity.
+
+    Returns (parent_ids, matrix) with one row per review.
+    """
+    parent_ids = []
+    parent_index = {}
+    parents = []
+    rows = []
+    inline = []
+
+    for chunk in chunks:
+        parent_id = chunk['parent_id']
+        if parent_id not in parent_index:
+            parent_index[parent_id] = len(parent_ids)
+            parent_ids.append(parent_id)
+        parents.append(parent_index[parent_id])
+        if 'vector_row' in chunk:
+            rows.append(chunk['vector_row'])
+        else:
+            inline.append(chunk['vector'])
+
+    if rows and inline:
+        raise ValueError("Chunks mix sidecar rows and inline vectors")
+    if rows and vectors is None:
+        raise ValueError("Chunks reference vector rows but no sidecar was given")
+
+    parents = np.array(parents, dtype=np.int64)
+    source = np.asarray(inline, dtype=np.float32) if inline else vectors
+    rows = np.array(rows, dtype=np.int64) if rows else np.arange(len(parents))
+
+    sums = np.zeros((len(parent_ids), source.shape[1] if len(parents) else 0), dtype=np.float32)
+    # Read the sidecar in blocks so only a slice of it is paged in at a time
+    for start in range(0, len(parents), block_size):
+        block = normalize_rows(np.asarray(source[rows[start:start + block_size]], dtype=np.float32))
+        np.add.at(sums, parents[start:start + block_size], block)
+
+    return parent_ids, normalize_rows(sums)
+
+
+def top_k_neighbors(matrix, query_rows, k=5, block_size=1024):
+    """
+    Return, for each row in query_rows, the indices of its k most similar rows
+    by cosine similarity (rows are unit length), best first, excluding itself.
+    """
+    k = min(k, len(matrix) - 1)
+    neighbors = np.empty((len(query_rows), max(k, 0)), dtype=np.int64)
+    if k <= 0:
+        return neighbors
+
+    query_rows = np.asarray(query_rows, dtype=np.int64)
+    for start in range(0, len(query_rows), block_size):
+        block_rows = query_rows[start:start + block_size]
+        similarities = matrix[block_rows] @ matrix.T
+        similarities[np.arange(len(block_rows)), block_rows] = -np.inf
+
+        # Select the top k without sorting every row, then order just those
+        top = np.argpartition(-similarities, k - 1, axis=1)[:, :k]
+        order = np.argsort(-np.take_along_axis(similarities, top, axis=1), axis=1)
+        neighbors[start:start + len(block_rows)] = np.take_along_axis(top, order, axis=1)
+    return neighbors
+
+
+def read_hot_ids(path):
+    """One review id per line; blank lines are ignored"""
+    with open(path, 'r') as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Compute one vector per review from its paragraph vectors and write Solr atomic updates "
+                    "(JSONL on STDOUT) that store it, plus precomputed neighbor lists, on the boosted core."
+    )
+    parser.add_argument('--input', default="data/ign_semantic.jsonl",
+                        help='Paragraph documents written by get_embeddings.py (JSON array or JSONL)')
+    parser.add_argument('--vectors', default=None,
+                        help='Float32 .npy sidecar written by get_embeddings.py --vectors-out')
+    parser.add_argument('--top-k', type=int, default=SIMILAR_NEIGHBORS,
+                        help=f'Neighbors stored per review, at most {SIMILAR_NEIGHBORS} (default: {SIMILAR_NEIGHBORS}, 0 to skip)')
+    parser.add_argument('--hot', default=None,
+                        help='File with the review ids (one per line) that get neighbor lists; default: every review')
+    args = parser.parse_args()
+    if args.top_k > SIMILAR_NEIGHBORS:
+        parser.error(f'--top-k is at most {SIMILAR_NEIGHBORS}, the number of similar reviews the frontend shows')
+
+    vectors = load_vectors(args.vectors) if args.vectors else None
+    with open(args.input, 'r') as f:
+        parent_ids, matrix = mean_document_vectors(iter_documents(f), vectors)
+    print(f"Computed {len(parent_ids)} document vectors", file=sys.stderr)
+
+    similar = {}
+    if args.top_k > 0:
+        index = {parent_id: i for i, parent_id in enumerate(parent_ids)}
+        hot = read_hot_ids(args.hot) if args.hot else parent_ids
+        hot_rows = [index[parent_id] for parent_id in hot if parent_id in index]
+        for row, neighbor_rows in zip(hot_rows, top_k_neighbors(matrix, hot_rows, k=args.top_k)):
+            similar[parent_ids[row]] = [parent_ids[n] for n in neighbor_rows]
+        print(f"Computed neighbor lists for {len(similar)} reviews", file=sys.stderr)
+
+    for parent_id, vector in zip(parent_ids, matrix):
+        update = {'id': parent_id, 'doc_vector': {'set': vector.tolist()}}
+        if parent_id in similar:
+            update['similar_ids'] = {'set': similar[parent_id]}
+        write_jsonl(update, sys.stdout)
@@ -0,0 +1,221 @@
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+import numpy as np
+
+
+def normalize_query(text):
+    """Normalize query text so trivially different spellings share a cache entry"""
+    return ' '.join(text.lower().split())
+
+
+class TTLCache:
+    """Thread-safe LRU cache where entries also expire after ttl seconds"""
+
+    def __init__(self, max_entries=1024, ttl=3600):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, stored_at = entry
+                if self.ttl is None or time.time() - stored_at < self.ttl:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, value, stored_at=None):
+        with self._lock:
+            self._entries[key] = (value, stored_at if stored_at is not None else time.time())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        return {
+            'entries': len(self._entries),
+            'max_entries': self.max_entries,
+            'hits': self.hits,
+            'misses': self.misses
+        }
+
+
+class SqliteVectorStore:
+    """
+    Persistent key -> float32 vector table, stored as raw bytes in a SQLite file.
+
+    With ttl and/or max_entries the table is bounded: expired rows and the
+    oldest rows beyond max_entries are deleted on open and after every
+    prune_every writes, so it never holds more than max_entries + prune_every.
+    """
+
+    def __init__(self, path, max_entries=None, ttl=None, prune_every=100):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.prune_every = prune_every
+        self._writes = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS vectors ("
+            "key TEXT PRIMARY KEY, vector BLOB NOT NULL, stored_at REAL NOT NULL)"
+        )
+        if self.bounded:
+            self._conn.execute("CREATE INDEX IF NOT EXISTS vectors_stored_at ON vectors (stored_at)")
+        self._conn.commit()
+        if self.bounded:
+            self.prune()
+
+    @property
+    def bounded(self):
+        return self.max_entries is not None or self.ttl is not None
+
+    def prune(self):
+        """Delete expired rows, then the oldest rows beyond max_entries; returns the number deleted"""
+        with self._lock:
+            deleted = 0
+            if self.ttl is not None:
+                deleted += self._conn.execute(
+                    "DELETE FROM vectors WHERE stored_at < ?", (time.time() - self.ttl,)
+                ).rowcount
+            if self.max_entries is not None:
+                deleted += self._conn.execute(
+                    "DELETE FROM vectors WHERE key IN ("
+                    "SELECT key FROM vectors ORDER BY stored_at DESC LIMIT -1 OFFSET ?)", (self.max_entries,)
+                ).rowcount
+            self._conn.commit()
+            self._writes = 0
+        return deleted
+
+    def get(self, key):
+        """Return (vector, stored_at) for key, or None if it is not stored"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT vector, stored_at FROM vectors WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        return np.frombuffer(row[0], dtype=np.float32), row[1]
+
+    def get_many(self, keys, batch_size=500):
+        """Return {key: vector} for the keys that are stored; missing keys are left out"""
+        found = {}
+        keys = list(keys)
+        # Stay under SQLite's limit on bound parameters per statement
+        for start in range(0, len(keys), batch_size):
+            batch = keys[start:start + batch_size]
+            placeholders = ','.join('?' * len(batch))
+            with self._lock:
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM vectors WHERE key IN ({placeholders})", batch
+                ).fetchall()
+            for key, blob in rows:
+                found[key] = np.frombuffer(blob, dtype=np.float32)
+        return found
+
+    def put(self, key, vector):
+        self.put_many([(key, vector)])
+
+    def put_many(self, items):
+        """Store (key, vector) pairs in a single transaction"""
+        now = time.time()
+        rows = [(key, np.asarray(vector, dtype=np.float32).tobytes(), now) for key, vector in items]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO vectors (key, vector, stored_at) VALUES (?, ?, ?)", rows
+            )
+            self._conn.commit()
+            self._writes += len(rows)
+            due = self.bounded and self._writes >= self.prune_every
+        if due:
+            self.prune()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM vectors").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class QueryEmbeddingCache:
+    """
+    Bounded cache of query embeddings keyed by (model name, normalized query).
+
+    Vectors are kept as float32 arrays in an in-memory LRU. If disk_path is given,
+    entries are also written to a SQLite file so they survive restarts; it is
+    bounded by the same ttl and by disk_max_entries rows.
+    """
+
+    def __init__(self, max_entries=1024, ttl=3600, disk_path=None, disk_max_entries=None):
+        self.memory = TTLCache(max_entries=max_entries, ttl=ttl)
+        self.ttl = ttl
+        self.disk = None
+        if disk_path:
+            self.disk = SqliteVectorStore(disk_path, max_entries=disk_max_entries or 10 * max_entries, ttl=ttl)
+        self.disk_hits = 0
+
+    @staticmethod
+    def make_key(text, model_name):
+        return f"{model_name}\x1f{normalize_query(text)}"
+
+    def get(self, text, model_name):
+        key = self.make_key(text, model_name)
+        vector = self.memory.get(key)
+        if vector is not None or self.disk is None:
+            return vector
+
+        stored = self.disk.get(key)
+        if stored is None:
+            return None
+        vector, stored_at = stored
+        if self.ttl is not None and time.time() - stored_at >= self.ttl:
+            return None
+
+        # Promote to memory, keeping the original timestamp so the TTL still applies
+        self.disk_hits += 1
+        self.memory.put(key, vector, stored_at=stored_at)
+        return vector
+
+    def put(self, text, model_name, vector):
+        key = self.make_key(text, model_name)
+        vector = np.asarray(vector, dtype=np.float32)
+        self.memory.put(key, vector)
+        if self.disk is not None:
+            self.disk.put(key, vector)
+
+    def get_or_compute(self, text, model_name, compute):
+        """Return the cached vector for text, calling compute(text, model_name) only on a miss"""
+        vector = self.get(text, model_name)
+        if vector is None:
+            # The vector must come from the model named in its key
+            vector = np.asarray(compute(text, model_name), dtype=np.float32)
+            self.put(text, model_name, vector)
+        return vector
+
+    def stats(self):
+        stats = self.memory.stats()
+        # Memory misses that were then found on disk are hits from the caller's point of view
+        stats['disk_hits'] = self.disk_hits
+        stats['misses'] = self.memory.misses - self.disk_hits
+        stats['disk_enabled'] = self.disk is not None
+        return stats
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+
+import argparse
+import sys
+from itertools import islice
+from category_matcher import (
+    CategoryMatcher, CATEGORY_SLUGS, CATEGORY_THRESHOLD, OTHER_CATEGORY
+)
+from json_stream import iter_documents, write_jsonl
+
+# Length of the stored preview that search results show instead of the full review
+PREVIEW_CHARS = 240
+
+
+def make_preview(content, max_chars=PREVIEW_CHARS):
+    """Cut content to at most max_chars, ending on a word boundary when possible"""
+    content = ' '.join(content.split())
+    if len(content) <= max_chars:
+        return content
+    cut = content.rfind(' ', 0, max_chars + 1)
+    return content[:cut if cut > 0 else max_chars]
+
+
+def enrich_documents(docs, matcher):
+    """
+    Add precomputed category fields to a batch of reviews:
+    - cat_score_<slug>: keyword score of the review for each category
+    - categories: slugs of every category scoring above the threshold (for fq filters)
+    - primary_category: best category name, or OTHER_CATEGORY (for clustering)
+    - Preview: start of the review, so search results do not need Content
+    """
+    texts = [f"{doc.get('Title', '')} {doc.get('Content', '')}" for doc in docs]
+    scores = matcher.score(texts)
+
+    for doc, row in zip(docs, scores):
+        slugs = [CATEGORY_SLUGS[name] for name in matcher.category_names]
+        for slug, score in zip(slugs, row):
+            doc[f"cat_score_{slug}"] = int(score)
+
+        doc['categories'] = [slug for slug, score in zip(slugs, row) if score > CATEGORY_THRESHOLD]
+        best = int(row.argmax())
+        doc['primary_category'] = matcher.category_names[best] if row[best] > CATEGORY_THRESHOLD else OTHER_CATEGORY
+        doc['Preview'] = make_preview(doc.get('Content', ''))
+    return docs
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Add precomputed category fields to reviews (JSON array or JSONL on STDIN, JSONL on STDOUT)."
+    )
+    parser.add_argument('--batch-size', type=int, default=500, help='Reviews scored per batch (default: 500)')
+    args = parser.parse_args()
+
+    matcher = CategoryMatcher()
+    documents = iter_documents(sys.stdin)
+    total = 0
+    while True:
+        batch = list(islice(documents, args.batch_size))
+        if not batch:
+            break
+        for doc in enrich_documents(batch, matcher):
+            write_jsonl(doc, sys.stdout)
+        total += len(batch)
+
+    print(f"Enriched {total} reviews", file=sys.stderr)
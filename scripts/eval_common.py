@@ -0,0 +1,88 @@
+import glob
+import json
+import os
+import re
+import numpy as np
+from knn_query import knn_params
+
+
+def query_text(q):
+    """Plain query text from a Lucene query string: field prefixes, boosts and operators removed"""
+    return ' '.join(re.sub(r'\w+:|\^[\d.]+|\b(AND|OR|NOT)\b|[()"]', ' ', q).split())
+
+
+def load_queries(queries_dir="queries"):
+    """[(name, text, qrels path)] for every queries/<name>/ with a query_sys1.json"""
+    queries = []
+    for query_file in sorted(glob.glob(os.path.join(queries_dir, '*', 'query_sys1.json'))):
+        query_dir = os.path.dirname(query_file)
+        with open(query_file, 'r') as f:
+            q = json.load(f)['params']['q']
+        queries.append((os.path.basename(query_dir), query_text(q), os.path.join(query_dir, 'qrels.txt')))
+    return queries
+
+
+def load_query_texts(path=None, queries_dir="queries"):
+    """Query texts, one per line of path, or else those of every queries/*/query_sys1.json"""
+    if path:
+        with open(path, 'r') as f:
+            return [line.strip() for line in f if line.strip()]
+    return [text for _, text, _ in load_queries(queries_dir)]
+
+
+def load_qrels(path):
+    """Set of relevant ids from a qrels file in TREC format (query iteration id relevance)"""
+    relevant = set()
+    with open(path, 'r') as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 4 and int(parts[3]) > 0:
+                relevant.add(parts[2])
+    return relevant
+
+
+def average_precision(retrieved, relevant):
+    """Mean of the precision at the rank of every relevant id retrieved, over all relevant ids"""
+    hits = 0
+    total = 0.0
+    for rank, doc_id in enumerate(retrieved, 1):
+        if doc_id in relevant:
+            hits += 1
+            total += hits / rank
+    return total / len(relevant) if relevant else 0.0
+
+
+def precision_at_k(retrieved, relevant, k):
+    return sum(1 for doc_id in retrieved[:k] if doc_id in relevant) / k
+
+
+def solr_knn_ids(session, core_url, query_vector, k, top_k, field="vector"):
+    """Ids of the first k results of a {!knn} query on a core"""
+    response = session.post(f"{core_url}/select", json={
+        "params": {
+            **knn_params(query_vector, top_k, field=field),
+            "fl": "id",
+            "rows": k
+        }
+    }, timeout=(5, 60))
+    response.raise_for_status()
+    return [doc['id'] for doc in response.json()['response']['docs']]
+
+
+def recall_at_k(retrieved, relevant):
+    """Fraction of the relevant ids that were retrieved"""
+    return len(set(retrieved) & set(relevant)) / max(len(relevant), 1)
+
+
+def core_index_size(session, base_url, core):
+    """Size on disk of a core's index in bytes, from the CoreAdmin STATUS action"""
+    response = session.get(f"{base_url}/admin/cores",
+                           params={'action': 'STATUS', 'core': core, 'wt': 'json'}, timeout=(5, 60))
+    response.raise_for_status()
+    return response.json()['status'][core]['index']['sizeInBytes']
+
+
+def latency_summary(seconds):
+    """p50 and p95 of a list of latencies, in milliseconds"""
+    seconds = np.asarray(seconds)
+    return float(np.percentile(seconds, 50) * 1000), float(np.percentile(seconds, 95) * 1000)
@@ -1,71 +1,331 @@
 import sys
 import json
 import re
-from sentence_transformers import SentenceTransformer
-
-# Load the SentenceTransformer model
-model = SentenceTransformer('all-MiniLM-L6-v2')
+import time
+import argparse
+import hashlib
+from collections import Counter
+from functools import partial
+import numpy as np
+import model_registry
+from embedding_cache import SqliteVectorStore
+from json_stream import iter_documents, write_jsonl
+from vector_sidecar import VectorSidecarWriter
+from quantization import calibrate_file
 
 def get_embedding(text):
     """Generate embedding for given text"""
-    return model.encode(text, convert_to_tensor=False).tolist()
+    return model_registry.encode(text).tolist()
+
+def encode_texts(texts, batch_size=64, pool=None):
+    """
+    Encode texts in batches and return a float32 matrix in the original order.
+
+    Texts are sorted by length first so each batch holds similarly sized inputs
+    and little compute is wasted on padding. If a multi-process pool is given
+    the batches are spread over its worker processes.
+    """
+    if not texts:
+        return np.zeros((0, 0), dtype=np.float32)
+
+    order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+    sorted_texts = [texts[i] for i in order]
+
+    if pool is not None:
+        model = model_registry.get_model()
+        sorted_embeddings = model.encode_multi_process(sorted_texts, pool, batch_size=batch_size)
+    else:
+        sorted_embeddings = model_registry.encode(sorted_texts, batch_size=batch_size)
+
+    # Put the vectors back in the order the texts came in
+    embeddings = np.empty_like(sorted_embeddings, dtype=np.float32)
+    embeddings[order] = sorted_embeddings
+    return embeddings
+
+def content_key(text, model_name=model_registry.DEFAULT_MODEL):
+    """Key of a chunk in the embedding store: changes whenever the model or the text changes"""
+    return hashlib.sha256(f"{model_name}\x1f{text}".encode('utf-8')).hexdigest()
+
+def encode_with_store(texts, store, stats, batch_size=64, pool=None):
+    """
+    Encode texts, reusing vectors already in the persistent store.
+
+    Only texts whose key is not in the store are sent to the model; their
+    vectors are added to the store so the next run can reuse them.
+    """
+    keys = [content_key(text) for text in texts]
+    cached = store.get_many(set(keys))
+
+    missing = [i for i, key in enumerate(keys) if key not in cached]
+    new_embeddings = encode_texts([texts[i] for i in missing], batch_size=batch_size, pool=pool)
+    if missing:
+        store.put_many((keys[i], vector) for i, vector in zip(missing, new_embeddings))
+        cached.update((keys[i], vector) for i, vector in zip(missing, new_embeddings))
+
+    stats['reused'] += len(texts) - len(missing)
+    stats['recomputed'] += len(missing)
+
+    if not texts:
+        return np.zeros((0, 0), dtype=np.float32)
+    return np.stack([cached[key] for key in keys])
 
-def split_content_into_paragraphs(content):
-    """Split content into paragraphs using multiple possible delimiters"""
-    # Remove any excessive whitespace first
+# A trailing chunk adding fewer new tokens than this takes sentences from the previous chunk
+MIN_CHUNK_TOKENS = 32
+
+SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?])\s+')
+
+def split_long_sentence(sentence, max_tokens, count_tokens):
+    """Cut a sentence longer than max_tokens at word boundaries; returns [(text, tokens)]"""
+    words = sentence.split()
+    pieces = []
+    current = []
+    total = 0
+    for word, length in zip(words, count_tokens(words)):
+        if current and total + length > max_tokens:
+            pieces.append((' '.join(current), total))
+            current = []
+            total = 0
+        current.append(word)
+        total += length
+    if current:
+        pieces.append((' '.join(current), total))
+    return pieces
+
+def split_content_into_chunks(content, max_tokens, count_tokens=model_registry.count_tokens,
+                              overlap=0, min_tokens=MIN_CHUNK_TOKENS):
+    """
+    Split content into chunks of whole sentences of at most max_tokens tokens.
+
+    Sentences are tokenized once and packed greedily with a running token
+    count, so the work is linear in the length of the review. Each chunk
+    repeats the last `overlap` sentences of the previous one. A trailing chunk
+    that adds fewer than min_tokens new tokens takes sentences from the end of
+    the previous chunk, while both stay within budget and the previous chunk
+    stays at least as long, so no compute goes to a sliver of text (or to the
+    overlap sentences in front of it). Returns [(text, tokens)].
+    """
     content = ' '.join(content.split())
-    
-    # Try various ways to split into paragraphs
-    # 1. Split on periods followed by whitespace
-    sentences = re.split(r'(?<=[.!?])\s+', content)
-    
-    # Group sentences into paragraphs (e.g., 3-4 sentences per paragraph)
-    paragraphs = []
-    current_paragraph = []
-    for sentence in sentences:
-        current_paragraph.append(sentence)
-        # Create a new paragraph after every 3 sentences or if sentence is very long
-        if len(current_paragraph) >= 3 or len(''.join(current_paragraph)) > 500:
-            paragraphs.append(' '.join(current_paragraph))
-            current_paragraph = []
-    
-    # Add any remaining sentences as the last paragraph
-    if current_paragraph:
-        paragraphs.append(' '.join(current_paragraph))
-    
-    return paragraphs
+    sentences = [sentence for sentence in SENTENCE_BOUNDARY.split(content) if sentence]
+    if not sentences:
+        return []
 
-if __name__ == "__main__":
-    # Read JSON from STDIN
-    data = json.load(sys.stdin)
+    # A sentence that does not fit on its own would be truncated by the model
+    units = []
+    for sentence, length in zip(sentences, count_tokens(sentences)):
+        if length > max_tokens:
+            units.extend(split_long_sentence(sentence, max_tokens, count_tokens))
+        else:
+            units.append((sentence, length))
+    lengths = [length for _, length in units]
+
+    bounds = []  # (first unit, end unit, tokens)
+    start = 0
+    total = 0
+    for i, length in enumerate(lengths):
+        if i > start and total + length > max_tokens:
+            bounds.append((start, i, total))
+            start = max(start + 1, i - overlap)
+            total = sum(lengths[start:i])
+            # Give up overlapping sentences rather than exceed the budget
+            while start < i and total + length > max_tokens:
+                total -= lengths[start]
+                start += 1
+        total += length
+
+    # The greedy packing only closes a chunk when the next sentence does not fit,
+    # so a short tail can never be merged back; move the boundary instead
+    if bounds and sum(lengths[bounds[-1][1]:]) < min_tokens:
+        first, end, tokens = bounds[-1]
+        tail = sum(lengths[end:])
+        while (tail < min_tokens and end - 1 > first and tail + lengths[end - 1] <= max_tokens
+               and tokens - lengths[end - 1] >= tail + lengths[end - 1]):
+            end -= 1
+            tokens -= lengths[end]
+            tail += lengths[end]
+        bounds[-1] = (first, end, tokens)
+
+        start = max(first + 1, end - overlap)
+        total = sum(lengths[start:])
+        while start < end and total > max_tokens:
+            total -= lengths[start]
+            start += 1
+    bounds.append((start, len(units), total))
+
+    return [(' '.join(text for text, _ in units[first:end]), tokens) for first, end, tokens in bounds]
+
+def build_chunk_documents(document, max_tokens=None, count_tokens=model_registry.count_tokens,
+                          overlap=0, stats=None):
+    """
+    Split a review into one document per chunk, plus the text to embed for each.
+
+    The title and subtitle are embedded with every chunk, so they are taken
+    off the model's token budget. If stats is a Counter, it counts the chunks
+    by the token length of their embedded text.
+    """
+    if max_tokens is None:
+        max_tokens = model_registry.max_tokens()
+
+    prefix = f"{document['Title']} {document.get('Subtitle', '')}"
+    prefix_tokens = count_tokens([prefix])[0]
+    budget = max(max_tokens - prefix_tokens, MIN_CHUNK_TOKENS)
+
+    chunks = []
+    for i, (paragraph, tokens) in enumerate(split_content_into_chunks(
+            document['Content'], budget, count_tokens=count_tokens, overlap=overlap)):
+        # Create combined text for embedding
+        combined_text = f"{prefix} {paragraph}"
+
+        # Create new document
+        new_doc = {
+            'id': f"{document['id']}_{i}",  # Unique ID for each paragraph
+            'parent_id': document['id'],     # Original document ID
+            'Title': document['Title'],
+            'Subtitle': document.get('Subtitle', ''),
+            'Score': document.get('Score', 0.0),
+            'Content': paragraph,            # Store just the paragraph
+            'paragraph_num': i               # Keep track of paragraph order
+        }
+        chunks.append((new_doc, combined_text))
+        if stats is not None:
+            stats[prefix_tokens + tokens] += 1
+
+    return chunks
+
+def chunk_report(token_counts, max_tokens):
+    """One-line summary of the chunk sizes of a run, from a Counter of chunk token lengths"""
+    if not token_counts:
+        return "No chunks"
+    lengths = sorted(token_counts)
+    counts = np.repeat(lengths, [token_counts[length] for length in lengths])
+    return (f"Chunks: {len(counts)}, tokens per chunk mean {counts.mean():.0f}, "
+            f"p50 {np.percentile(counts, 50):.0f}, p95 {np.percentile(counts, 95):.0f}, "
+            f"min {counts.min()}, max {counts.max()} (model window {max_tokens}), "
+            f"{int((counts < MIN_CHUNK_TOKENS).sum())} under {MIN_CHUNK_TOKENS} tokens")
+
+def attach_vectors(docs, embeddings, sidecar=None):
+    """Store each vector inline, or in the sidecar with only its row number in the document"""
+    if sidecar is not None:
+        first_row = sidecar.append(embeddings)
+        for offset, new_doc in enumerate(docs):
+            new_doc['vector_row'] = first_row + offset
+    else:
+        for new_doc, vector in zip(docs, embeddings):
+            new_doc['vector'] = vector.tolist()
+
+def embed_all(documents, out, encode, sidecar=None, chunk=build_chunk_documents):
+    """Embed the whole corpus at once and write it as a single JSON array"""
+    # Split every document first so all paragraphs can be encoded in batches
     processed_data = []
-    
-    # Process each document
-    for document in data:
-        # Split content into paragraphs
-        paragraphs = split_content_into_paragraphs(document['Content'])
-        
-        # Create a document for each paragraph
-        for i, paragraph in enumerate(paragraphs):
-            # Skip empty paragraphs
-            if not paragraph.strip():
-                continue
-                
-            # Create combined text for embedding
-            combined_text = f"{document['Title']} {document.get('Subtitle', '')} {paragraph}"
-            
-            # Create new document
-            new_doc = {
-                'id': f"{document['id']}_{i}",  # Unique ID for each paragraph
-                'parent_id': document['id'],     # Original document ID
-                'Title': document['Title'],
-                'Subtitle': document.get('Subtitle', ''),
-                'Score': document.get('Score', 0.0),
-                'Content': paragraph,            # Store just the paragraph
-                'paragraph_num': i,              # Keep track of paragraph order
-                'vector': get_embedding(combined_text)
-            }
+    texts = []
+    for document in documents:
+        for new_doc, combined_text in chunk(document):
             processed_data.append(new_doc)
-    
-    # Output updated JSON to STDOUT
-    json.dump(processed_data, sys.stdout, indent=2, ensure_ascii=False)
\ No newline at end of file
+            texts.append(combined_text)
+
+    embeddings = encode(texts)
+    attach_vectors(processed_data, embeddings, sidecar)
+
+    json.dump(processed_data, out, indent=2, ensure_ascii=False)
+    return len(texts)
+
+def embed_streaming(documents, out, encode, window=2048, sidecar=None, chunk=build_chunk_documents):
+    """
+    Embed the corpus window by window and write one chunk document per line.
+
+    At most `window` paragraphs (plus one review) are held in memory at a time,
+    so memory use does not grow with the size of the corpus.
+    """
+    total = 0
+    pending_docs = []
+    pending_texts = []
+
+    def flush():
+        embeddings = encode(pending_texts)
+        attach_vectors(pending_docs, embeddings, sidecar)
+        for new_doc in pending_docs:
+            write_jsonl(new_doc, out)
+        pending_docs.clear()
+        pending_texts.clear()
+
+    for document in documents:
+        for new_doc, combined_text in chunk(document):
+            pending_docs.append(new_doc)
+            pending_texts.append(combined_text)
+        if len(pending_texts) >= window:
+            total += len(pending_texts)
+            flush()
+
+    if pending_texts:
+        total += len(pending_texts)
+        flush()
+    return total
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Split reviews into paragraphs and add embeddings (JSON on STDIN/STDOUT).")
+    parser.add_argument('--batch-size', type=int, default=64, help='Paragraphs per encode batch (default: 64)')
+    parser.add_argument('--processes', type=int, default=1, help='Encoder processes to run in parallel (default: 1)')
+    parser.add_argument('--stream', action='store_true',
+                        help='Read a JSON array or JSONL incrementally and write one chunk per line (JSONL)')
+    parser.add_argument('--window', type=int, default=2048,
+                        help='Paragraphs to encode per window in --stream mode (default: 2048)')
+    parser.add_argument('--vectors-out', type=str, default=None,
+                        help='Write vectors to this float32 .npy sidecar and only their row number to the JSON')
+    parser.add_argument('--store', type=str, default=None,
+                        help='SQLite embedding store; unchanged chunks reuse their stored vector instead of being re-encoded')
+    parser.add_argument('--max-tokens', type=int, default=None,
+                        help="Token budget per chunk including the title (default: the model's input window)")
+    parser.add_argument('--overlap', type=int, default=0,
+                        help='Sentences repeated from the end of the previous chunk (default: 0)')
+    parser.add_argument('--calibrate-out', type=str, default=None,
+                        help='Calibrate int8 quantization of the --vectors-out sidecar and write the scale to this JSON file')
+    args = parser.parse_args()
+    if args.calibrate_out and not args.vectors_out:
+        parser.error('--calibrate-out needs --vectors-out')
+
+    # One worker process per core, each with its own copy of the model
+    pool = None
+    if args.processes > 1:
+        pool = model_registry.get_model().start_multi_process_pool(target_devices=['cpu'] * args.processes)
+
+    sidecar = VectorSidecarWriter(args.vectors_out) if args.vectors_out else None
+
+    store = SqliteVectorStore(args.store) if args.store else None
+    store_stats = {'reused': 0, 'recomputed': 0}
+    if store is not None:
+        encode = partial(encode_with_store, store=store, stats=store_stats, batch_size=args.batch_size, pool=pool)
+    else:
+        encode = partial(encode_texts, batch_size=args.batch_size, pool=pool)
+
+    max_tokens = args.max_tokens or model_registry.max_tokens()
+    chunk_tokens = Counter()
+    chunk = partial(build_chunk_documents, max_tokens=max_tokens, overlap=args.overlap, stats=chunk_tokens)
+
+    start = time.perf_counter()
+    try:
+        if args.stream:
+            # Documents are read lazily from STDIN, chunks written as soon as they are embedded
+            count = embed_streaming(iter_documents(sys.stdin), sys.stdout, encode,
+                                    window=args.window, sidecar=sidecar, chunk=chunk)
+        else:
+            # Read JSON from STDIN and output updated JSON to STDOUT
+            count = embed_all(json.load(sys.stdin), sys.stdout, encode, sidecar=sidecar, chunk=chunk)
+    finally:
+        if pool is not None:
+            model_registry.get_model().stop_multi_process_pool(pool)
+        if sidecar is not None:
+            sidecar.close()
+        if store is not None:
+            store.close()
+    elapsed = time.perf_counter() - start
+
+    # Chunks reused from the store are not encoded, so they do not count towards the encoding rate
+    encoded = store_stats['recomputed'] if store is not None else count
+    rate = encoded / elapsed if elapsed > 0 else 0.0
+    print(f"Wrote {count} paragraphs in {elapsed:.1f}s, encoded {encoded} ({rate:.1f} paragraphs/sec, "
+          f"batch size {args.batch_size}, {args.processes} process(es))", file=sys.stderr)
+    print(chunk_report(chunk_tokens, max_tokens), file=sys.stderr)
+    if args.calibrate_out:
+        calibrate_file(args.vectors_out, args.calibrate_out)
+    if store is not None:
+        print(f"Embedding store: {store_stats['reused']} chunks reused, "
+              f"{store_stats['recomputed']} recomputed", file=sys.stderr)
@@ -0,0 +1,59 @@
+import json
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = ' \t\r\n'
+
+
+def iter_documents(fp, read_size=1 << 16):
+    """
+    Yield documents one at a time from a JSON array or a JSONL stream.
+
+    Only a small window of the input is held in memory, so this works for
+    files much larger than RAM. The format is detected from the first
+    non-whitespace character ('[' means a JSON array).
+    """
+    buffer = ''
+    pos = 0
+    eof = False
+    in_array = None
+
+    while True:
+        # Skip whitespace (and commas between array items), reading more input if needed
+        separators = _WHITESPACE + ',' if in_array else _WHITESPACE
+        while True:
+            while pos < len(buffer) and buffer[pos] in separators:
+                pos += 1
+            if pos < len(buffer) or eof:
+                break
+            chunk = fp.read(read_size)
+            buffer, pos, eof = chunk, 0, not chunk
+
+        if pos >= len(buffer):
+            return
+
+        if in_array is None:
+            in_array = buffer[pos] == '['
+            if in_array:
+                pos += 1
+            continue
+        if in_array and buffer[pos] == ']':
+            return
+
+        try:
+            document, end = _decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            # The next document is not complete yet; read at least as much again
+            chunk = fp.read(max(read_size, len(buffer) - pos))
+            buffer, pos, eof = buffer[pos:] + chunk, 0, not chunk
+            continue
+
+        yield document
+        pos = end
+
+
+def write_jsonl(document, fp):
+    """Write a single document as one JSON line"""
+    fp.write(json.dumps(document, ensure_ascii=False))
+    fp.write('\n')
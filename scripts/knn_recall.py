@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+
+import argparse
+import sys
+import time
+import numpy as np
+import model_registry
+from eval_common import load_query_texts, solr_knn_ids, recall_at_k, latency_summary
+from solr_client import SOLR_BASE_URL, make_session
+from vector_index import VectorIndex
+
+
+def measure_recall(index, session, core_url, texts, k=10, top_k=50):
+    """
+    Compare the local index with Solr's {!knn} for each query text.
+
+    Returns per-query recall@k of Solr's results against the exact local
+    ones, and the latency of each backend in seconds.
+    """
+    recalls = []
+    solr_seconds = []
+    local_seconds = []
+    for text in texts:
+        query_vector = model_registry.encode(text)
+
+        start = time.perf_counter()
+        solr_ids = solr_knn_ids(session, core_url, query_vector, k, top_k)
+        solr_seconds.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        rows, _ = index.knn(query_vector, top_k=k)
+        local_ids = [index.docs[index.doc_for_row[row]]['id'] for row in rows]
+        local_seconds.append(time.perf_counter() - start)
+
+        # The local search is exact, so it is the ground truth for the approximate HNSW search
+        recalls.append(recall_at_k(solr_ids, local_ids))
+    return np.array(recalls), np.array(solr_seconds), np.array(local_seconds)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Measure recall@k of Solr's HNSW {!knn} search against exact search over the local vector index."
+    )
+    parser.add_argument('--documents', default="data/ign_semantic.jsonl", help='Paragraph documents written by get_embeddings.py')
+    parser.add_argument('--vectors', default=None, help='Float32 .npy sidecar of the paragraph documents')
+    parser.add_argument('--queries', default=None,
+                        help='File with one query text per line (default: terms of queries/*/query_sys1.json)')
+    parser.add_argument('--uri', default=SOLR_BASE_URL, help=f'URI of the Solr instance (default: {SOLR_BASE_URL})')
+    parser.add_argument('--core', default="ign_semantic", help="Solr core to compare with (default: 'ign_semantic')")
+    parser.add_argument('-k', type=int, default=10, help='Results compared per query (default: 10)')
+    parser.add_argument('--top-k', type=int, default=50, help='topK of the Solr knn query (default: 50)')
+    args = parser.parse_args()
+
+    texts = load_query_texts(args.queries)
+    if not texts:
+        print("No queries found", file=sys.stderr)
+        sys.exit(1)
+
+    index = VectorIndex.load(args.documents, args.vectors)
+    print(f"Loaded {len(index)} paragraphs", file=sys.stderr)
+
+    recalls, solr_seconds, local_seconds = measure_recall(
+        index, make_session(), f"{args.uri}/{args.core}", texts, k=args.k, top_k=args.top_k
+    )
+
+    for text, recall in zip(texts, recalls):
+        print(f"recall@{args.k} {recall:.3f}  {text[:60]}")
+    print(f"\nMean recall@{args.k} over {len(texts)} queries: {recalls.mean():.4f}")
+    for name, seconds in (('solr', solr_seconds), ('local', local_seconds)):
+        p50, p95 = latency_summary(seconds)
+        print(f"{name:>5} latency p50 {p50:.1f} ms, p95 {p95:.1f} ms")
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+
+import argparse
+import csv
+import itertools
+import subprocess
+import sys
+import time
+import numpy as np
+import model_registry
+from chunk_indexer import index_in_chunks
+from knn_query import knn_params
+from eval_common import load_queries, load_qrels, average_precision, precision_at_k, core_index_size, latency_summary
+from solr_client import SOLR_BASE_URL, make_session
+from vector_schema import build_schema
+
+CONFIGSET = "/opt/solr/server/solr/configsets/_default"
+FIELDS = ['max_connections', 'beam_width', 'top_k', 'build_seconds', 'index_bytes',
+          'p50_ms', 'p95_ms', 'map', 'p_at_k']
+
+
+def solr_container():
+    """Id of the running Solr container, as the Makefile finds it"""
+    container = subprocess.run(['docker', 'ps', '-qf', 'name=solr'], capture_output=True, text=True,
+                               check=True).stdout.split()
+    if not container:
+        raise RuntimeError("No running Solr container found")
+    return container[0]
+
+
+def create_core(session, base_url, container, core, schema):
+    subprocess.run(['docker', 'exec', container, 'solr', 'create_core', '-c', core, '-d', CONFIGSET],
+                   check=True, stdout=subprocess.DEVNULL)
+    session.post(f"{base_url}/{core}/schema", json=schema, timeout=(5, 120)).raise_for_status()
+
+
+def delete_core(container, core):
+    subprocess.run(['docker', 'exec', container, 'solr', 'delete', '-c', core],
+                   check=True, stdout=subprocess.DEVNULL)
+
+
+def run_queries(session, core_url, queries, top_k, rows):
+    """
+    Run every (vector, relevant ids) query as a knn search collapsed to
+    reviews, the way the application searches. Returns (latencies, APs, P@ks).
+    """
+    seconds = []
+    aps = []
+    p_at_ks = []
+    for vector, relevant, k in queries:
+        start = time.perf_counter()
+        response = session.post(f"{core_url}/select", json={
+            "params": {
+                **knn_params(vector, top_k),
+                "fq": "{!collapse field=parent_id}",
+                "fl": "parent_id",
+                "rows": rows
+            }
+        }, timeout=(5, 60))
+        response.raise_for_status()
+        seconds.append(time.perf_counter() - start)
+
+        retrieved = [doc['parent_id'] for doc in response.json()['response']['docs']]
+        aps.append(average_precision(retrieved, relevant))
+        p_at_ks.append(precision_at_k(retrieved, relevant, k))
+    return seconds, aps, p_at_ks
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Rebuild the semantic core for every HNSW parameter combination and record build time, "
+                    "index size, knn latency and MAP/P@k against the qrels in queries/."
+    )
+    parser.add_argument('--input', default="data/ign_semantic.jsonl", help='Paragraph documents written by get_embeddings.py')
+    parser.add_argument('--vectors', default=None, help='Float32 .npy sidecar of the paragraph documents')
+    parser.add_argument('--max-connections', type=int, nargs='+', default=[8, 16, 32], help='hnswMaxConnections values')
+    parser.add_argument('--beam-width', type=int, nargs='+', default=[50, 100, 200], help='hnswBeamWidth values')
+    parser.add_argument('--top-k', type=int, nargs='+', default=[10, 50, 100], help='knn topK values')
+    parser.add_argument('-k', type=int, default=10, help='Cut-off for P@k (default: 10)')
+    parser.add_argument('--rows', type=int, default=30, help='Reviews retrieved per query (default: 30)')
+    parser.add_argument('--repeat', type=int, default=5, help='Timed passes over the queries per topK (default: 5)')
+    parser.add_argument('--uri', default=SOLR_BASE_URL, help=f'URI of the Solr instance (default: {SOLR_BASE_URL})')
+    parser.add_argument('--core-prefix', default="ign_semantic_sweep", help='Name prefix of the temporary cores')
+    parser.add_argument('--synonyms-core', default="ign_semantic",
+                        help="Existing core whose synonyms.txt the temporary cores use (default: 'ign_semantic')")
+    parser.add_argument('--schema', default="docker/solr/conf/semantic_schema.json", help='Base semantic schema')
+    parser.add_argument('--queries-dir', default="queries", help='Directory with <query>/query_sys1.json and qrels.txt')
+    parser.add_argument('--out', default="results/knn_sweep.csv", help='CSV file for the results')
+    parser.add_argument('--keep', action='store_true', help='Keep the temporary cores instead of deleting them')
+    args = parser.parse_args()
+
+    # Query vectors and qrels do not depend on the index, so they are prepared once
+    queries = [(model_registry.encode(text), load_qrels(qrels), args.k)
+               for _, text, qrels in load_queries(args.queries_dir)]
+    if not queries:
+        print("No queries found", file=sys.stderr)
+        sys.exit(1)
+
+    session = make_session()
+    container = solr_container()
+    rows = []
+    for max_connections, beam_width in itertools.product(args.max_connections, args.beam_width):
+        core = f"{args.core_prefix}_m{max_connections}_b{beam_width}"
+        schema = build_schema(args.schema, core, max_connections, beam_width,
+                              synonyms_core=args.synonyms_core)
+        print(f"Building {core}...", file=sys.stderr)
+        create_core(session, args.uri, container, core, schema)
+        try:
+            start = time.perf_counter()
+            index_in_chunks(args.input, f"{args.uri}/{core}", vectors_file=args.vectors)
+            build_seconds = time.perf_counter() - start
+            index_bytes = core_index_size(session, args.uri, core)
+
+            for top_k in args.top_k:
+                # One untimed pass warms the searcher and the OS page cache
+                run_queries(session, f"{args.uri}/{core}", queries, top_k, args.rows)
+                seconds = []
+                for _ in range(args.repeat):
+                    pass_seconds, aps, p_at_ks = run_queries(session, f"{args.uri}/{core}", queries, top_k, args.rows)
+                    seconds.extend(pass_seconds)
+                p50, p95 = latency_summary(seconds)
+                rows.append({
+                    'max_connections': max_connections, 'beam_width': beam_width, 'top_k': top_k,
+                    'build_seconds': round(build_seconds, 1), 'index_bytes': index_bytes,
+                    'p50_ms': round(p50, 2), 'p95_ms': round(p95, 2),
+                    'map': round(float(np.mean(aps)), 4), 'p_at_k': round(float(np.mean(p_at_ks)), 4)
+                })
+        finally:
+            if not args.keep:
+                delete_core(container, core)
+
+    with open(args.out, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
+
+    print(f"\n{'M':>4} {'beam':>5} {'topK':>5} {'build s':>8} {'size MB':>8} {'p50 ms':>7} {'p95 ms':>7} "
+          f"{'MAP':>6} {f'P@{args.k}':>6}")
+    for row in rows:
+        print(f"{row['max_connections']:>4} {row['beam_width']:>5} {row['top_k']:>5} {row['build_seconds']:>8} "
+              f"{row['index_bytes'] / 2 ** 20:>8.1f} {row['p50_ms']:>7} {row['p95_ms']:>7} "
+              f"{row['map']:>6} {row['p_at_k']:>6}")
+    print(f"\nResults written to {args.out}")
@@ -0,0 +1,97 @@
+import sys
+import threading
+import time
+from sentence_transformers import SentenceTransformer
+
+DEFAULT_MODEL = 'all-MiniLM-L6-v2'
+
+# One entry per model name: loaded once per process and shared by every caller
+_models = {}
+_encode_locks = {}
+_stats = {}
+_registry_lock = threading.Lock()
+
+
+def get_model(model_name=DEFAULT_MODEL):
+    """Return the shared SentenceTransformer for model_name, loading it on first use"""
+    model = _models.get(model_name)
+    if model is not None:
+        return model
+
+    with _registry_lock:
+        # Another thread may have loaded it while we were waiting for the lock
+        model = _models.get(model_name)
+        if model is None:
+            start = time.perf_counter()
+            model = SentenceTransformer(model_name)
+            load_seconds = time.perf_counter() - start
+
+            _encode_locks[model_name] = threading.Lock()
+            _stats[model_name] = {
+                'load_seconds': load_seconds,
+                'encode_calls': 0,
+                'encoded_texts': 0,
+                'encode_seconds_total': 0.0,
+                'encode_seconds_max': 0.0,
+                'encode_seconds_last': 0.0
+            }
+            _models[model_name] = model
+            print(f"Loaded model {model_name} in {load_seconds:.2f}s", file=sys.stderr)
+    return model
+
+
+def encode(texts, model_name=DEFAULT_MODEL, **kwargs):
+    """Encode a text (or list of texts) with the shared model and record its latency"""
+    model = get_model(model_name)
+    kwargs.setdefault('convert_to_tensor', False)
+
+    # The HuggingFace tokenizers are not safe to call from several threads at once
+    with _encode_locks[model_name]:
+        start = time.perf_counter()
+        embeddings = model.encode(texts, **kwargs)
+        elapsed = time.perf_counter() - start
+
+        stats = _stats[model_name]
+        stats['encode_calls'] += 1
+        stats['encoded_texts'] += 1 if isinstance(texts, str) else len(texts)
+        stats['encode_seconds_total'] += elapsed
+        stats['encode_seconds_max'] = max(stats['encode_seconds_max'], elapsed)
+        stats['encode_seconds_last'] = elapsed
+
+    return embeddings
+
+
+def count_tokens(texts, model_name=DEFAULT_MODEL):
+    """Return the number of tokenizer tokens in each text, not counting special tokens"""
+    texts = list(texts)
+    if not texts:
+        return []
+    model = get_model(model_name)
+    with _encode_locks[model_name]:
+        input_ids = model.tokenizer(texts, add_special_tokens=False)['input_ids']
+    return [len(ids) for ids in input_ids]
+
+
+def max_tokens(model_name=DEFAULT_MODEL):
+    """Return how many text tokens the model encodes before it starts truncating"""
+    model = get_model(model_name)
+    return model.max_seq_length - model.tokenizer.num_special_tokens_to_add()
+
+
+def warm_up(model_names=(DEFAULT_MODEL,)):
+    """Load the given models and run one dummy encode so the first real query is fast"""
+    for model_name in model_names:
+        encode("warm up", model_name=model_name)
+
+
+def get_stats():
+    """Return load time and encode latency for every loaded model"""
+    with _registry_lock:
+        report = {}
+        for model_name, stats in _stats.items():
+            calls = stats['encode_calls']
+            report[model_name] = dict(
+                stats,
+                encode_seconds_avg=stats['encode_seconds_total'] / calls if calls else 0.0
+            )
+        return report
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+
+import argparse
+import json
+import sys
+import numpy as np
+from vector_sidecar import load_vectors
+
+
+def calibrate_scale(vectors, percentile=99.9, sample=100000, block_size=65536, seed=0):
+    """
+    Compute the factor that maps float vectors onto the int8 range.
+
+    The scale maps the given percentile of absolute component values to 127,
+    so a few outlying components are clipped instead of squeezing every
+    other value into a handful of levels. At most `sample` rows are read.
+    """
+    rows = len(vectors)
+    if rows > sample:
+        picked = np.sort(np.random.default_rng(seed).choice(rows, size=sample, replace=False))
+    else:
+        picked = np.arange(rows)
+
+    values = np.concatenate([
+        np.abs(np.asarray(vectors[picked[start:start + block_size]], dtype=np.float32)).ravel()
+        for start in range(0, len(picked), block_size)
+    ]) if len(picked) else np.zeros(1, dtype=np.float32)
+
+    max_abs = float(np.percentile(values, percentile))
+    return {
+        'scale': 127.0 / max_abs if max_abs > 0 else 1.0,
+        'percentile': percentile,
+        'max_abs': max_abs,
+        'rows': int(len(picked))
+    }
+
+
+def quantize(vectors, scale):
+    """Round scaled vectors to int8 (Solr's vectorEncoding=BYTE), clipping to [-128, 127]"""
+    return np.clip(np.rint(np.asarray(vectors, dtype=np.float32) * scale), -128, 127).astype(np.int8)
+
+
+def load_scale(path):
+    with open(path, 'r') as f:
+        return json.load(f)['scale']
+
+
+def calibrate_file(vectors_path, out_path, percentile=99.9, sample=100000):
+    """Calibrate the vectors of a .npy sidecar and write the result to out_path as JSON"""
+    vectors = load_vectors(vectors_path)
+    calibration = calibrate_scale(vectors, percentile=percentile, sample=sample)
+
+    # Report how much precision the quantization keeps on the first rows
+    head = np.asarray(vectors[:min(len(vectors), 10000)], dtype=np.float32)
+    restored = quantize(head, calibration['scale']).astype(np.float32) / calibration['scale']
+    calibration['mean_abs_error'] = float(np.abs(restored - head).mean()) if len(head) else 0.0
+
+    with open(out_path, 'w') as f:
+        json.dump(calibration, f, indent=2)
+    print(f"Quantization scale {calibration['scale']:.2f} from {calibration['rows']} rows "
+          f"(p{percentile} |x| = {calibration['max_abs']:.4f}, "
+          f"mean abs error {calibration['mean_abs_error']:.5f}), written to {out_path}", file=sys.stderr)
+    return calibration
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Calibrate the int8 quantization scale of the vectors in a float32 .npy sidecar."
+    )
+    parser.add_argument('--vectors', default="data/ign_semantic_vectors.npy",
+                        help='Float32 .npy sidecar written by get_embeddings.py --vectors-out')
+    parser.add_argument('--out', default="data/ign_semantic_vectors.scale.json", help='JSON file for the calibration')
+    parser.add_argument('--percentile', type=float, default=99.9,
+                        help='Percentile of absolute values mapped to 127 (default: 99.9)')
+    parser.add_argument('--sample', type=int, default=100000, help='Rows sampled for calibration (default: 100000)')
+    args = parser.parse_args()
+
+    calibrate_file(args.vectors, args.out, percentile=args.percentile, sample=args.sample)
@@ -0,0 +1,31 @@
+import numpy as np
+
+# Standard RRF constant: dampens the advantage of the very first ranks
+RRF_K = 60
+
+
+def reciprocal_rank_fusion(ranked_lists, k=RRF_K, weights=None):
+    """
+    Fuse ranked lists of ids with (weighted) reciprocal rank fusion.
+
+    Each id scores sum(weight / (k + rank)) over the lists it appears in, with
+    ranks starting at 1. All lists are scored in one pass over the
+    concatenated ids. Returns (ids, scores), best first; ties keep the order
+    in which ids first appear.
+    """
+    if weights is None:
+        weights = [1.0] * len(ranked_lists)
+
+    ids = [doc_id for ranked in ranked_lists for doc_id in ranked]
+    if not ids:
+        return [], np.zeros(0)
+
+    ranks = np.concatenate([np.arange(1, len(ranked) + 1) for ranked in ranked_lists])
+    list_weights = np.repeat(np.asarray(weights, dtype=np.float64), [len(ranked) for ranked in ranked_lists])
+
+    unique_ids, first_seen, inverse = np.unique(np.array(ids, dtype=object), return_index=True, return_inverse=True)
+    scores = np.bincount(inverse, weights=list_weights / (k + ranks), minlength=len(unique_ids))
+
+    # Sort by score, then by first appearance
+    order = np.lexsort((first_seen, -scores))
+    return unique_ids[order].tolist(), scores[order]
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+
+import argparse
+import csv
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from eval_common import load_qrels, average_precision, precision_at_k
+from solr_client import SOLR_BASE_URL, make_session
+
+# Core each system's query files (query_<system>.json) are run against
+SYSTEM_CORES = {
+    'sys1': 'ign_simple',
+    'sys2': 'ign_boosted'
+}
+# Run id solr2trec.py writes by default, so run files match those of `make query`
+RUN_ID = "run0"
+P_AT_K = [5, 10, 15, 20]
+METRIC_FIELDS = ['query', 'system', 'retrieved', 'relevant', 'ap'] + [f'p@{k}' for k in P_AT_K]
+
+
+def load_jobs(queries_dir, system_cores):
+    """[(query name, system, Solr body)] for every queries/<name>/query_<system>.json of a known system"""
+    jobs = []
+    for query_file in sorted(glob.glob(os.path.join(queries_dir, '*', 'query_*.json'))):
+        system = os.path.basename(query_file)[len('query_'):-len('.json')]
+        if system not in system_cores:
+            print(f"Skipping {query_file}: no core for system '{system}'", file=sys.stderr)
+            continue
+        with open(query_file, 'r') as f:
+            body = json.load(f)
+        # Only ids and scores are evaluated, so the review texts are not fetched
+        body['params']['fl'] = 'id,Score'
+        jobs.append((os.path.basename(os.path.dirname(query_file)), system, body))
+    return jobs
+
+
+def run_query(session, base_url, core, body):
+    response = session.post(f"{base_url}/{core}/select", json=body, timeout=(5, 60))
+    response.raise_for_status()
+    return response.json()['response']['docs']
+
+
+def trec_lines(docs, run_id):
+    """Run file lines in the format solr2trec.py writes"""
+    return [f"0 Q0 {doc['id']} {rank} {doc.get('Score', 1.0)} {run_id}\n" for rank, doc in enumerate(docs, start=1)]
+
+
+def precision_recall(retrieved, relevant):
+    hits = np.cumsum([doc_id in relevant for doc_id in retrieved])
+    ranks = np.arange(1, len(retrieved) + 1)
+    return hits / ranks, hits / max(len(relevant), 1)
+
+
+def plot_curve(precision, recall, ap, output_file):
+    """Interpolated precision-recall curve of one system for one query, like plot_pr.py draws"""
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    recall_points = np.linspace(0, 1, 100)
+    fig = plt.figure(figsize=(10, 6))
+    # Interpolated precision: the best precision at any recall >= r
+    interpolated = [precision[recall >= r].max() if (recall >= r).any() else 0 for r in recall_points]
+    plt.plot(recall_points, interpolated, '-', label=f'AP: {ap:.3f}')
+    plt.xlabel('Recall')
+    plt.ylabel('Precision')
+    plt.title('Precision-Recall Curve')
+    plt.grid(True)
+    plt.legend(loc='lower left')
+    fig.savefig(output_file, bbox_inches='tight', dpi=150)
+    plt.close(fig)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Run every queries/*/query_sys*.json against its core in one process and write TREC runs, "
+                    "qrels and metrics to the results directory."
+    )
+    parser.add_argument('--queries-dir', default="queries", help='Directory with <query>/query_<system>.json and qrels.txt')
+    parser.add_argument('--results-dir', default="results", help='Directory for the run files and metrics')
+    parser.add_argument('--uri', default=SOLR_BASE_URL, help=f'URI of the Solr instance (default: {SOLR_BASE_URL})')
+    parser.add_argument('--core', action='append', default=[], metavar='SYSTEM=CORE',
+                        help='Core of a system, e.g. sys2=ign_boosted (repeatable)')
+    parser.add_argument('--workers', type=int, default=8, help='Concurrent queries (default: 8)')
+    parser.add_argument('--plot', action='store_true', help='Also plot the precision-recall curves of every query')
+    args = parser.parse_args()
+
+    system_cores = dict(SYSTEM_CORES)
+    system_cores.update(entry.split('=', 1) for entry in args.core)
+
+    jobs = load_jobs(args.queries_dir, system_cores)
+    if not jobs:
+        print("No queries found", file=sys.stderr)
+        sys.exit(1)
+
+    # Every query shares one pool of keep-alive connections
+    start = time.perf_counter()
+    session = make_session(pool_size=args.workers)
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        futures = [executor.submit(run_query, session, args.uri, system_cores[system], body)
+                   for _, system, body in jobs]
+        docs_by_job = [future.result() for future in futures]
+    print(f"Ran {len(jobs)} queries in {time.perf_counter() - start:.2f}s", file=sys.stderr)
+
+    metrics = []
+    curves = {}
+    for (query, system, _), docs in zip(jobs, docs_by_job):
+        query_results = os.path.join(args.results_dir, query)
+        os.makedirs(query_results, exist_ok=True)
+        with open(os.path.join(query_results, f"results_{system}_trec.txt"), 'w') as f:
+            f.writelines(trec_lines(docs, RUN_ID))
+
+        qrels_path = os.path.join(args.queries_dir, query, 'qrels.txt')
+        relevant = load_qrels(qrels_path)
+        if query not in curves:
+            # The qrels are already in TREC format, so they are copied as they are
+            with open(qrels_path, 'r') as src, open(os.path.join(query_results, 'qrels_trec.txt'), 'w') as dst:
+                dst.write(src.read())
+            curves[query] = {}
+
+        retrieved = [doc['id'] for doc in docs]
+        row = {'query': query, 'system': system, 'retrieved': len(retrieved), 'relevant': len(relevant),
+               'ap': round(average_precision(retrieved, relevant), 4)}
+        row.update({f'p@{k}': round(precision_at_k(retrieved, relevant, k), 4) for k in P_AT_K})
+        metrics.append(row)
+
+        if args.plot and retrieved:
+            precision, recall = precision_recall(retrieved, relevant)
+            curves[query][system] = (precision, recall, row['ap'])
+
+    # MAP and mean P@k of every system over all queries
+    systems = sorted({row['system'] for row in metrics})
+    for system in systems:
+        rows = [row for row in metrics if row['system'] == system]
+        summary = {'query': 'all', 'system': system, 'retrieved': sum(row['retrieved'] for row in rows),
+                   'relevant': sum(row['relevant'] for row in rows)}
+        summary.update({field: round(float(np.mean([row[field] for row in rows])), 4)
+                        for field in METRIC_FIELDS[4:]})
+        metrics.append(summary)
+
+    metrics_path = os.path.join(args.results_dir, 'metrics.csv')
+    with open(metrics_path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=METRIC_FIELDS)
+        writer.writeheader()
+        writer.writerows(metrics)
+
+    print(f"{'query':<18} {'system':<6} {'AP':>6} " + ' '.join(f"{f'P@{k}':>6}" for k in P_AT_K))
+    for row in metrics:
+        print(f"{row['query']:<18} {row['system']:<6} {row['ap']:>6.3f} "
+              + ' '.join(f"{row[f'p@{k}']:>6.3f}" for k in P_AT_K))
+    print(f"\nMetrics written to {metrics_path}")
+
+    if args.plot:
+        for query, query_curves in curves.items():
+            for system, (precision, recall, ap) in query_curves.items():
+                plot_curve(precision, recall, ap, os.path.join(args.results_dir, query, f"prec_rec_{system}.png"))
@@ -1,16 +1,23 @@
 import sys
 import json
+import argparse
 import requests
-from sentence_transformers import SentenceTransformer
+import model_registry
+from knn_query import knn_params
+from vector_index import VectorIndex
 
-def semantic_search(query_text, solr_url, k=30):
-    """Perform semantic search using vector embeddings"""
-    model = SentenceTransformer('all-MiniLM-L6-v2')
-    query_embedding = model.encode(query_text, convert_to_tensor=False).tolist()
+SEARCH_FIELDS = ["id", "parent_id", "Title", "Content", "Score", "paragraph_num", "score"]
+
+def semantic_search(query_text, solr_url, k=30, index=None, top_k=50):
+    """Perform semantic search using vector embeddings (on a local VectorIndex if one is given)"""
+    query_embedding = model_registry.encode(query_text)
+    
+    if index is not None:
+        return index.select(query_embedding, rows=k, top_k=top_k, fl=SEARCH_FIELDS)
     
     params = {
-        "q": "{!knn f=vector topK=50}" + str(query_embedding),
-        "fl": "id,parent_id,Title,Content,Score,paragraph_num,score",
+        **knn_params(query_embedding, top_k),
+        "fl": ",".join(SEARCH_FIELDS),
         "rows": k,
         "wt": "json"
     }
@@ -45,13 +52,19 @@ def save_results(results, query_name, suffix="_rewritten"):
     print(f"   cat {results_file} | python3 scripts/plot_pr.py --relevance {results_dir}/relevance_semantic{suffix}.txt --output {results_dir}/pr_curve_semantic{suffix}.png")
 
 def main():
-    if len(sys.argv) != 3:
-        print("Usage: python3 semantic_evaluation.py <query_name> \"<query_text>\"")
-        sys.exit(1)
+    parser = argparse.ArgumentParser(description="Run a semantic query and save its results for evaluation.")
+    parser.add_argument('query_name', help='Query directory name under results/')
+    parser.add_argument('query_text', help='Query text')
+    parser.add_argument('--documents', default=None,
+                        help='Search a local vector index built from these paragraph documents instead of Solr')
+    parser.add_argument('--vectors', default=None, help='Float32 .npy sidecar of the paragraph documents')
+    parser.add_argument('--top-k', type=int, default=50, help='Paragraphs the knn search considers (default: 50)')
+    args = parser.parse_args()
     
-    category = sys.argv[1]
-    query_text = sys.argv[2]
+    category = args.query_name
+    query_text = args.query_text
     solr_url = "http://localhost:8983/solr/ign_semantic"
+    index = VectorIndex.load(args.documents, args.vectors) if args.documents else None
     
     # Expand query with category-specific terms
     expanded_query = query_text + " gameplay mechanics control system input response"
@@ -59,7 +72,7 @@ def main():
     print(f"Expanded query: {expanded_query}")
     
     # Get results
-    results = semantic_search(expanded_query, solr_url)
+    results = semantic_search(expanded_query, solr_url, index=index, top_k=args.top_k)
     
     # Save with _rewritten suffix
     save_results(results, category, "_rewritten")
@@ -1,24 +1,39 @@
 import sys
 import json
+import argparse
 import requests
-from sentence_transformers import SentenceTransformer
-from collections import defaultdict
+import model_registry
+from knn_query import knn_params
+from vector_index import VectorIndex
 
-def semantic_search(query_text, solr_url, k=30):  # Increased k for more candidates
+SEARCH_FIELDS = ["id", "parent_id", "Title", "Content", "Score", "paragraph_num", "score"]
+
+def semantic_search(query_text, solr_url, k=5, paragraphs_per_review=3, index=None, top_k=50):
     """
-    Perform semantic search using vector embeddings
+    Perform semantic search using vector embeddings.
+
+    Paragraph hits are collapsed on parent_id by Solr, so the response holds
+    the k best reviews (each represented by its best paragraph) and the
+    expanded section holds up to paragraphs_per_review - 1 further paragraphs
+    of each of them.
+
+    If a local VectorIndex is given it answers the search instead of Solr,
+    with a response of the same shape.
     """
-    # Load the model and generate embedding for query
-    model = SentenceTransformer('all-MiniLM-L6-v2')
-    query_embedding = model.encode(query_text, convert_to_tensor=False).tolist()
+    # Generate embedding for query with the shared model
+    query_embedding = model_registry.encode(query_text)
     
-    # Format the vector string properly
-    vector_str = str(query_embedding).replace(' ', '')
+    if index is not None:
+        return index.select(query_embedding, rows=k, top_k=top_k, fl=SEARCH_FIELDS,
+                            collapse=True, expand_rows=paragraphs_per_review - 1)
     
     # Prepare Solr query with explicit parameters
     params = {
-        "q": "{!knn f=vector topK=50}" + vector_str,  # Increased topK further
-        "fl": "id,parent_id,Title,Content,Score,paragraph_num,score",
+        **knn_params(query_embedding, top_k),
+        "fq": "{!collapse field=parent_id}",  # Keep the best paragraph of each review
+        "expand": "true",
+        "expand.rows": paragraphs_per_review - 1,
+        "fl": ",".join(SEARCH_FIELDS),
         "rows": k,
         "wt": "json",
         "sort": "score desc"
@@ -36,49 +51,42 @@ def semantic_search(query_text, solr_url, k=30):  # Increased k for more candida
 
 def display_results(results):
     """Display search results in a readable format"""
+    # One document per review: its best paragraph, in score order
     docs = results['response']['docs']
-    print(f"\nFound {len(docs)} relevant paragraphs")
+    expanded = results.get('expanded', {})
+    print(f"\nFound {len(docs)} relevant reviews")
     print("-" * 80)
     
-    # Group paragraphs by review
-    reviews = defaultdict(list)
-    for doc in docs:
-        parent_id = doc['parent_id']
-        if isinstance(parent_id, list):
-            parent_id = parent_id[0]
-            
-        reviews[parent_id].append(doc)
-    
-    # Display top 5 reviews with their relevant paragraphs
-    for parent_id, paragraphs in list(reviews.items())[:5]:
-        # Sort paragraphs by their order in the review
+    for best in docs:
+        # The review's other matching paragraphs, sorted by their order in the review
+        paragraphs = [best] + expanded.get(best['parent_id'], {}).get('docs', [])
         paragraphs.sort(key=lambda x: x['paragraph_num'])
         
-        # Get review title
-        title = paragraphs[0]['Title']
-        if isinstance(title, list):
-            title = title[0]
-            
-        print(f"\nReview: {title}")
-        print(f"Best match score: {max(float(p.get('score', 0)) for p in paragraphs):.4f}")
+        print(f"\nReview: {best['Title']}")
+        print(f"Best match score: {float(best.get('score', 0)):.4f}")
         print("\nRelevant excerpts:")
         
-        # Show up to 3 most relevant paragraphs from each review
-        for para in paragraphs[:3]:
-            content = para['Content']
-            if isinstance(content, list):
-                content = content[0]
+        for para in paragraphs:
             print(f"\nParagraph {para['paragraph_num']}:")
-            print(content)
+            print(para['Content'])
         
         print("-" * 80)
 
 def main():
+    parser = argparse.ArgumentParser(description="Semantic search over the paragraph core.")
+    parser.add_argument('query', nargs='*', help='Query text (prompted for if omitted)')
+    parser.add_argument('--documents', default=None,
+                        help='Search a local vector index built from these paragraph documents instead of Solr')
+    parser.add_argument('--vectors', default=None, help='Float32 .npy sidecar of the paragraph documents')
+    parser.add_argument('--top-k', type=int, default=50, help='Paragraphs the knn search considers (default: 50)')
+    args = parser.parse_args()
+
     solr_url = "http://localhost:8983/solr/ign_semantic"
+    index = VectorIndex.load(args.documents, args.vectors) if args.documents else None
     
     # Get query from command line or prompt
-    if len(sys.argv) > 1:
-        query = " ".join(sys.argv[1:])
+    if args.query:
+        query = " ".join(args.query)
     else:
         query = input("Enter your search query: ")
     
@@ -88,7 +96,7 @@ def main():
     print(f"\nSearching for: {query}")
     
     try:
-        results = semantic_search(enhanced_query, solr_url)
+        results = semantic_search(enhanced_query, solr_url, index=index, top_k=args.top_k)
         display_results(results)
     except Exception as e:
         print(f"Error performing search: {str(e)}")
@@ -0,0 +1,175 @@
+import threading
+import time
+from collections import deque
+import numpy as np
+import requests
+from requests.adapters import HTTPAdapter
+
+SOLR_BASE_URL = "http://localhost:8983/solr"
+
+
+def make_session(pool_size=10):
+    """Create a requests session that keeps up to pool_size connections to Solr alive"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+class LatencyStats:
+    """Per-key request counters and a window of recent latencies for percentiles"""
+
+    def __init__(self, window=1000):
+        self.window = window
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def record(self, key, seconds, error=False):
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = self._stats[key] = {
+                    'requests': 0, 'errors': 0, 'seconds_total': 0.0,
+                    'recent': deque(maxlen=self.window)
+                }
+            stats['requests'] += 1
+            stats['errors'] += int(error)
+            stats['seconds_total'] += seconds
+            stats['recent'].append(seconds)
+
+    def report(self):
+        with self._lock:
+            report = {}
+            for key, stats in self._stats.items():
+                recent = np.array(stats['recent']) if stats['recent'] else np.zeros(1)
+                report[key] = {
+                    'requests': stats['requests'],
+                    'errors': stats['errors'],
+                    'seconds_avg': stats['seconds_total'] / stats['requests'],
+                    'seconds_p50': float(np.percentile(recent, 50)),
+                    'seconds_p95': float(np.percentile(recent, 95)),
+                    'seconds_max': float(recent.max())
+                }
+            return report
+
+
+class SolrClient:
+    """
+    Solr client shared by all routes: one pooled keep-alive session, timeouts
+    on every request, retries for selects and per-core latency metrics.
+
+    Cores can be addressed by their name or by a key of the `cores` mapping
+    (e.g. 'boosted' -> 'ign_boosted').
+    """
+
+    def __init__(self, base_url=SOLR_BASE_URL, cores=None, pool_size=20,
+                 connect_timeout=2.0, read_timeout=10.0, retries=2, backoff=0.1):
+        self.base_url = base_url.rstrip('/')
+        self.cores = dict(cores or {})
+        self.timeout = (connect_timeout, read_timeout)
+        self.retries = retries
+        self.backoff = backoff
+        self.session = make_session(pool_size=pool_size)
+        self.latency = LatencyStats()
+
+    def core_url(self, core):
+        return f"{self.base_url}/{self.cores.get(core, core)}"
+
+    def select(self, core, body):
+        """
+        Run a /select request with a JSON body such as {"params": {...}}.
+
+        Selects are read-only, so connection errors, timeouts and 5xx responses
+        are retried with backoff. Raises requests.RequestException on failure.
+        """
+        url = f"{self.core_url(core)}/select"
+        core_name = self.cores.get(core, core)
+
+        for attempt in range(self.retries + 1):
+            start = time.perf_counter()
+            try:
+                response = self.session.post(url, json=body, timeout=self.timeout)
+                if response.status_code >= 500 and attempt < self.retries:
+                    raise requests.HTTPError(f"{response.status_code} {response.reason}", response=response)
+                response.raise_for_status()
+                result = response.json()
+            except (requests.ConnectionError, requests.Timeout, requests.HTTPError) as e:
+                self.latency.record(core_name, time.perf_counter() - start, error=True)
+                retryable = not isinstance(e, requests.HTTPError) or e.response is None \
+                    or e.response.status_code >= 500
+                if not retryable or attempt >= self.retries:
+                    raise
+                time.sleep(self.backoff * 2 ** attempt)
+                continue
+            self.latency.record(core_name, time.perf_counter() - start)
+            return result
+
+    def stats(self):
+        return self.latency.report()
+
+    def index_version(self, core):
+        """Return the current index version of a core; it changes on every commit that alters the index"""
+        response = self.session.get(
+            f"{self.core_url(core)}/admin/luke",
+            params={'show': 'index', 'numTerms': 0, 'wt': 'json'},
+            timeout=self.timeout
+        )
+        response.raise_for_status()
+        return response.json()['index']['version']
+
+
+class IndexGenerations:
+    """
+    Generation counter per core, bumped whenever the core's index version changes.
+
+    Versions are polled by a background thread every check_interval seconds,
+    so reading a generation never waits on Solr. Caches that include the
+    generation in their keys are invalidated by the next commit.
+    """
+
+    def __init__(self, client, cores, check_interval=10.0):
+        self.client = client
+        self.cores = list(cores)
+        self.check_interval = check_interval
+        self._generations = {core: 0 for core in self.cores}
+        self._versions = {}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def get(self, core):
+        self._start()
+        return self._generations.get(core, 0)
+
+    def bump(self, core=None):
+        """Invalidate one core (or all of them) without waiting for the next poll"""
+        with self._lock:
+            for name in ([core] if core else self.cores):
+                self._generations[name] = self._generations.get(name, 0) + 1
+
+    def refresh(self):
+        for core in self.cores:
+            try:
+                version = self.client.index_version(core)
+            except (requests.RequestException, KeyError, ValueError):
+                # Keep serving from the current generation until Solr answers again
+                continue
+            with self._lock:
+                previous = self._versions.get(core)
+                self._versions[core] = version
+                if previous is not None and previous != version:
+                    self._generations[core] = self._generations.get(core, 0) + 1
+
+    def _start(self):
+        # Started lazily so each (possibly forked) worker process gets its own thread
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._poll, daemon=True)
+                self._thread.start()
+
+    def _poll(self):
+        while True:
+            self.refresh()
+            time.sleep(self.check_interval)
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+
+import argparse
+import json
+import sys
+from category_matcher import CATEGORY_SLUGS
+
+# Searcher events whose listeners replay the category browsing queries
+WARMING_EVENTS = ['firstSearcher', 'newSearcher']
+
+
+def warming_queries(slugs, rows=30):
+    """The category-only browsing request of the frontend, once per category slug"""
+    return [
+        {"q": "*:*", "fq": f"categories:{slug}", "sort": "Score desc", "rows": str(rows)}
+        for slug in slugs
+    ]
+
+
+def build_config(base_path, slugs=None):
+    """
+    Return the Config API commands of base_path plus QuerySenderListeners
+    that warm the filter of every category on startup and after every commit.
+    """
+    with open(base_path, 'r') as f:
+        config = json.load(f)
+
+    queries = warming_queries(slugs or CATEGORY_SLUGS.values())
+    config['add-listener'] = [
+        {
+            "event": event,
+            "name": f"category-warming-{event}",
+            "class": "solr.QuerySenderListener",
+            "queries": queries
+        }
+        for event in WARMING_EVENTS
+    ]
+    return config
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Write the boosted core's Config API commands (JSON on STDOUT) with category warming queries."
+    )
+    parser.add_argument('--base', default="docker/solr/conf/boosted_config.json", help='Config API JSON to start from')
+    args = parser.parse_args()
+
+    json.dump(build_config(args.base), sys.stdout, indent=2)
+    sys.stdout.write('\n')
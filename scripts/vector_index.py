@@ -0,0 +1,130 @@
+import numpy as np
+from json_stream import iter_documents
+from vector_sidecar import load_vectors
+
+
+class VectorIndex:
+    """
+    Exact in-process nearest-neighbour search over the paragraph vectors
+    written by get_embeddings.py, as an alternative to Solr's {!knn} query.
+
+    The vectors stay in the memory-mapped float32 sidecar and every search is
+    one BLAS matrix-vector product per block of rows, so the results are
+    exact (recall 1.0 against brute force) and no index has to be built.
+    Scores follow Solr's cosine similarity: (1 + cos) / 2.
+    """
+
+    def __init__(self, vectors, docs, rows=None, block_size=65536):
+        self.vectors = vectors
+        self.block_size = block_size
+        self.docs = docs
+
+        # doc_for_row[r]: position in docs of the document whose vector is row r (-1: none)
+        rows = np.arange(len(docs)) if rows is None else np.asarray(rows, dtype=np.int64)
+        self.doc_for_row = np.full(len(vectors), -1, dtype=np.int64)
+        self.doc_for_row[rows] = np.arange(len(docs))
+
+        self.norms = np.empty(len(vectors), dtype=np.float32)
+        for start in range(0, len(vectors), block_size):
+            self.norms[start:start + block_size] = np.linalg.norm(vectors[start:start + block_size], axis=1)
+        self.norms[self.norms == 0] = 1.0
+
+        self.review_scores = np.array(
+            [float(docs[i].get('Score', 0.0)) if i >= 0 else 0.0 for i in self.doc_for_row], dtype=np.float32
+        )
+
+    @classmethod
+    def load(cls, documents_path, vectors_path=None):
+        """
+        Load the paragraph documents (JSON array or JSONL) and their vectors,
+        either from the .npy sidecar they point into or inline.
+        """
+        docs = []
+        rows = []
+        inline = []
+        with open(documents_path, 'r') as f:
+            for doc in iter_documents(f):
+                row = doc.pop('vector_row', None)
+                vector = doc.pop('vector', None)
+                if row is None:
+                    row = len(inline)
+                    inline.append(vector)
+                docs.append(doc)
+                rows.append(row)
+
+        if inline and vectors_path:
+            raise ValueError("Documents carry inline vectors; do not pass a sidecar")
+        vectors = load_vectors(vectors_path) if vectors_path else np.asarray(inline, dtype=np.float32)
+        return cls(vectors, docs, rows=rows)
+
+    def __len__(self):
+        return len(self.docs)
+
+    def knn(self, query_vector, top_k=50, mask=None):
+        """Return (rows, scores) of the top_k most similar vectors, best first; mask limits the candidates"""
+        query = np.asarray(query_vector, dtype=np.float32)
+        query = query / (np.linalg.norm(query) or 1.0)
+
+        similarities = np.empty(len(self.vectors), dtype=np.float32)
+        for start in range(0, len(self.vectors), self.block_size):
+            block = self.vectors[start:start + self.block_size]
+            similarities[start:start + len(block)] = block @ query
+        similarities /= self.norms
+
+        valid = self.doc_for_row >= 0
+        if mask is not None:
+            valid &= mask
+        similarities[~valid] = -np.inf
+
+        top_k = min(top_k, int(valid.sum()))
+        if top_k <= 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+        top = np.argpartition(-similarities, top_k - 1)[:top_k]
+        top = top[np.argsort(-similarities[top], kind='stable')]
+        return top, (1.0 + similarities[top]) / 2.0
+
+    def select(self, query_vector, rows=10, top_k=50, fl=None, min_score=None,
+               collapse=False, expand_rows=0):
+        """
+        Answer a knn search with a Solr-style response, so callers written for
+        Solr's JSON can use the index unchanged.
+
+        Mirrors {!knn topK=top_k} with an optional Score:[min_score TO *]
+        filter, and, with collapse, {!collapse field=parent_id} plus
+        expand.rows=expand_rows over the paragraphs found by the knn search.
+        """
+        mask = self.review_scores >= min_score if min_score else None
+        hits, scores = self.knn(query_vector, top_k=top_k, mask=mask)
+        hits = [(self._doc(row, score, fl), row) for row, score in zip(hits, scores)]
+
+        if not collapse:
+            docs = [doc for doc, _ in hits]
+            return {'response': {'numFound': len(docs), 'docs': docs[:rows]}}
+
+        # The first (best) paragraph of each review heads its group
+        heads = []
+        groups = {}
+        for doc, row in hits:
+            parent_id = self.docs[self.doc_for_row[row]].get('parent_id')
+            if parent_id not in groups:
+                groups[parent_id] = []
+                heads.append((parent_id, doc))
+            else:
+                groups[parent_id].append(doc)
+
+        results = {'response': {'numFound': len(heads), 'docs': [doc for _, doc in heads[:rows]]}}
+        if expand_rows:
+            results['expanded'] = {
+                parent_id: {'numFound': len(groups[parent_id]), 'docs': groups[parent_id][:expand_rows]}
+                for parent_id, _ in heads[:rows] if groups[parent_id]
+            }
+        return results
+
+    def _doc(self, row, score, fl):
+        doc = self.docs[self.doc_for_row[row]]
+        if fl is not None:
+            doc = {field: doc[field] for field in fl if field in doc}
+        else:
+            doc = dict(doc)
+        doc['score'] = float(score)
+        return doc
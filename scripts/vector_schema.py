@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+
+import argparse
+import json
+import sys
+
+# Lucene's defaults for the HNSW graph
+DEFAULT_MAX_CONNECTIONS = 16
+DEFAULT_BEAM_WIDTH = 100
+
+
+def build_schema(base_path, core, max_connections=None, beam_width=None, encoding=None, synonyms_core=None):
+    """
+    Return the Schema API commands of base_path with the given HNSW parameters
+    and vector encoding set on every DenseVectorField type (None keeps the
+    base schema's value, or Solr's default), and synonym files read from the
+    conf directory of synonyms_core (default: core).
+    """
+    with open(base_path, 'r') as f:
+        schema = json.load(f)
+
+    synonyms = f"/var/solr/data/{synonyms_core or core}/conf/synonyms.txt"
+    for field_type in schema.get('add-field-type', []):
+        if field_type.get('class') == 'solr.DenseVectorField':
+            overrides = {'hnswMaxConnections': max_connections, 'hnswBeamWidth': beam_width,
+                         'vectorEncoding': encoding}
+            field_type.update((key, value) for key, value in overrides.items() if value is not None)
+        for analyzer in ('indexAnalyzer', 'queryAnalyzer', 'analyzer'):
+            for token_filter in field_type.get(analyzer, {}).get('filters', []):
+                if 'synonyms' in token_filter:
+                    token_filter['synonyms'] = synonyms
+    return schema
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Write the semantic core's schema (JSON on STDOUT) with the given HNSW parameters and vector encoding."
+    )
+    parser.add_argument('--base', default="docker/solr/conf/semantic_schema.json", help='Schema API JSON to start from')
+    parser.add_argument('--core', default="ign_semantic", help="Core the schema is for (default: 'ign_semantic')")
+    parser.add_argument('--max-connections', type=int, default=None,
+                        help=f'hnswMaxConnections: graph neighbours per node (Lucene default: {DEFAULT_MAX_CONNECTIONS})')
+    parser.add_argument('--beam-width', type=int, default=None,
+                        help=f'hnswBeamWidth: candidates considered while building (Lucene default: {DEFAULT_BEAM_WIDTH})')
+    parser.add_argument('--encoding', choices=['FLOAT32', 'BYTE'], default=None,
+                        help='vectorEncoding; BYTE needs vectors quantized by quantization.py (default: FLOAT32)')
+    parser.add_argument('--synonyms-core', default=None, help='Core whose synonyms.txt to use (default: --core)')
+    args = parser.parse_args()
+
+    schema = build_schema(args.base, args.core, args.max_connections, args.beam_width,
+                          encoding=args.encoding, synonyms_core=args.synonyms_core)
+    json.dump(schema, sys.stdout, indent=2)
+    sys.stdout.write('\n')
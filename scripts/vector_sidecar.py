@@ -0,0 +1,65 @@
+import os
+import numpy as np
+
+
+class VectorSidecarWriter:
+    """
+    Append float32 vectors to a .npy file without holding them all in memory.
+
+    Rows are appended to a raw temporary file while the corpus streams through;
+    close() wraps them in a proper .npy file that can be memory-mapped with
+    load_vectors(). The row number of every vector is returned by append() so
+    the metadata documents can refer to it.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.tmp_path = f"{path}.tmp"
+        self.dim = None
+        self.rows = 0
+        self._fp = open(self.tmp_path, 'wb')
+
+    def append(self, vectors):
+        """Append a (n, dim) matrix and return the row number of its first vector"""
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        if vectors.ndim != 2:
+            raise ValueError(f"Expected a 2-d matrix of vectors, got shape {vectors.shape}")
+        if self.dim is None:
+            self.dim = vectors.shape[1]
+        elif vectors.shape[1] != self.dim:
+            raise ValueError(f"Vector dimension changed from {self.dim} to {vectors.shape[1]}")
+
+        first_row = self.rows
+        self._fp.write(vectors.tobytes())
+        self.rows += vectors.shape[0]
+        return first_row
+
+    def close(self, block_rows=65536):
+        """Turn the raw rows into the final .npy file"""
+        self._fp.close()
+        if self.rows == 0:
+            # Nothing was written; numpy cannot memory-map an empty file
+            np.save(self.path, np.zeros((0, self.dim or 0), dtype=np.float32))
+            os.remove(self.tmp_path)
+            return
+
+        raw = np.memmap(self.tmp_path, dtype=np.float32, mode='r', shape=(self.rows, self.dim))
+        out = np.lib.format.open_memmap(self.path, mode='w+', dtype=np.float32, shape=(self.rows, self.dim))
+
+        # Copy in blocks so memory stays bounded for large corpora
+        for start in range(0, self.rows, block_rows):
+            out[start:start + block_rows] = raw[start:start + block_rows]
+        out.flush()
+        del out, raw
+        os.remove(self.tmp_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def load_vectors(path):
+    """Memory-map a vector sidecar; rows are read from disk only when accessed"""
+    return np.load(path, mmap_mode='r')